@@ -0,0 +1,86 @@
+"""Фикстуры нагрузочных тестов вью.
+Запуск: python -m pytest benchmarks
+Переменные окружения:
+BENCH_SIZES - наборы данных через запятую (по умолчанию все из SIZES),
+BENCH_ROUNDS - число замеров на вью,
+BENCH_TOLERANCE - допустимый рост задержки и памяти относительно базы,
+BENCH_MIN_DELTA_MS - рост задержки в мс, который ещё считается шумом,
+BENCH_UPDATE=1 - записать результаты вместо проверки.
+
+В репозитории (baselines.json) хранятся только показатели, которые
+не зависят от машины: число запросов и память. Задержка в мс у каждой
+машины своя, поэтому BENCH_UPDATE=1 пишет её в latency.local.json
+рядом, вне git, и проверяется она только при наличии этого файла.
+"""
+import json
+import os
+
+import pytest
+from django.core.management import call_command
+
+from posts.fake_data import Generator
+
+BASELINES = os.path.join(os.path.dirname(__file__), 'baselines.json')
+LATENCY_BASELINES = os.path.join(
+    os.path.dirname(__file__), 'latency.local.json'
+)
+# Размеры наборов generate_fake_data.
+SIZES = {
+    'small': {'users': 200, 'posts': 2000, 'comments': 2000},
+    'medium': {'users': 1000, 'posts': 20000, 'comments': 20000},
+}
+SEED = 20220301
+PASSWORD = 'bench-password'
+
+
+def selected_sizes():
+    names = os.environ.get('BENCH_SIZES')
+    if not names:
+        return list(SIZES)
+    return [name for name in names.split(',') if name in SIZES]
+
+
+def pytest_generate_tests(metafunc):
+    if 'dataset' in metafunc.fixturenames:
+        metafunc.parametrize(
+            'dataset', selected_sizes(), indirect=True, scope='module'
+        )
+
+
+def _stored(path):
+    """Базовые результаты из path; при BENCH_UPDATE=1 собираются новые
+    и в конце сессии записываются в path."""
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as source:
+            data = json.load(source)
+    else:
+        data = {}
+    yield data
+    if os.environ.get('BENCH_UPDATE'):
+        with open(path, 'w', encoding='utf-8') as target:
+            json.dump(data, target, indent=2, sort_keys=True)
+            target.write('\n')
+
+
+@pytest.fixture(scope='session')
+def baselines():
+    """Число запросов и память из baselines.json."""
+    yield from _stored(BASELINES)
+
+
+@pytest.fixture(scope='session')
+def latency_baselines():
+    """Задержка этой машины из latency.local.json; пусто, если
+    её ещё не записывали."""
+    yield from _stored(LATENCY_BASELINES)
+
+
+@pytest.fixture(scope='module')
+def dataset(request, django_db_setup, django_db_blocker):
+    """Наполняет тестовую базу набором размера request.param."""
+    with django_db_blocker.unblock():
+        call_command('flush', interactive=False, verbosity=0)
+        Generator(seed=SEED, password=PASSWORD, **SIZES[request.param]) \
+            .generate()
+        yield request.param
+        call_command('flush', interactive=False, verbosity=0)
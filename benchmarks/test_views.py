@@ -0,0 +1,171 @@
+"""Задержка, память и число запросов основных вью на наборах
+разного размера. Число запросов и память сравниваются с baselines.json,
+задержка - с latency.local.json этой машины, если он записан."""
+import gc
+import os
+import statistics
+import time
+import tracemalloc
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, reset_queries
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, User
+
+from .conftest import PASSWORD
+
+ROUNDS = int(os.environ.get('BENCH_ROUNDS', 30))
+WARMUP = 3
+TOLERANCE = float(os.environ.get('BENCH_TOLERANCE', 0.5))
+# Рост задержки меньше этого не считается регрессией: у быстрых вью
+# шум планировщика сравним с самим временем ответа.
+MIN_DELTA_MS = float(os.environ.get('BENCH_MIN_DELTA_MS', 5))
+# Показатели baselines.json; остальные (задержка) - в latency.local.json.
+SHARED_KEYS = ('queries', 'alloc_kb')
+
+
+def reader():
+    """Пользователь с самым большим числом подписок."""
+    return User.objects.get(pk=Follow.objects.values('user').annotate(
+        total=Count('pk')).order_by('-total', 'user')[0]['user'])
+
+
+def author():
+    """Автор с самым большим числом постов."""
+    return User.objects.get(pk=Post.objects.values('author').annotate(
+        total=Count('pk')).order_by('-total', 'author')[0]['author'])
+
+
+def commented_post():
+    return Post.objects.annotate(total=Count('comments')).order_by(
+        '-total', 'pk')[0]
+
+
+def busiest_group():
+    return Group.objects.annotate(total=Count('groups')).order_by(
+        '-total', 'pk')[0]
+
+
+# Вью: (нужен ли вход, метод, функция адреса, функция данных POST).
+VIEWS = {
+    'index': (False, 'get', lambda: reverse('posts:index'), None),
+    'group_posts': (False, 'get', lambda: reverse(
+        'posts:group_list', args=[busiest_group().slug]), None),
+    'profile': (False, 'get', lambda: reverse(
+        'posts:profile', args=[author().username]), None),
+    'post_detail': (False, 'get', lambda: reverse(
+        'posts:post_detail', args=[commented_post().pk]), None),
+    'follow_index': (True, 'get', lambda: reverse('posts:follow_index'),
+                     None),
+    'post_create': (True, 'post', lambda: reverse('posts:post_create'),
+                    lambda: {'text': 'Нагрузочный пост',
+                             'group': busiest_group().pk}),
+    'add_comment': (True, 'post', lambda: reverse(
+        'posts:add_comment', args=[commented_post().pk]),
+        lambda: {'text': 'Нагрузочный комментарий'}),
+}
+
+
+def measure(request):
+    """Замеряет request(): задержки ROUNDS вызовов, пик памяти
+    и число SQL-запросов одного вызова."""
+    for _ in range(WARMUP):
+        request()
+    timings = []
+    # Как timeit: сборка мусора не попадает в замеры задержки,
+    # рост памяти виден по alloc_kb.
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(ROUNDS):
+            started = time.perf_counter()
+            request()
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        gc.enable()
+    # Журнал запросов ограничен по длине; после генерации набора
+    # он может быть полон, и новые запросы не изменят его размер.
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        request()
+    # Срез журнала читается лениво, а следующий запрос его очистит.
+    query_count = len(queries)
+    tracemalloc.start()
+    try:
+        request()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    percentiles = statistics.quantiles(timings, n=100)
+    return {
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentiles[94], 2),
+        'alloc_kb': round(peak / 1024, 1),
+        'queries': query_count,
+    }
+
+
+def regressions(result, baseline):
+    """Список показателей, ухудшившихся сильнее допустимого.
+    Проверяются только показатели, которые есть в baseline.
+    Число запросов сравнивается точно, остальное - с TOLERANCE,
+    задержка должна вырасти ещё и не меньше чем на MIN_DELTA_MS."""
+    problems = []
+    if result['queries'] > baseline['queries']:
+        problems.append(
+            f'queries {result["queries"]} > {baseline["queries"]}'
+        )
+    # Хвост распределения шумнее медианы, допуск для p95 вдвое больше.
+    for key, tolerance in (
+        ('p50_ms', TOLERANCE), ('p95_ms', 2 * TOLERANCE),
+        ('alloc_kb', TOLERANCE),
+    ):
+        if key not in baseline:
+            continue
+        limit = baseline[key] * (1 + tolerance)
+        if key.endswith('_ms'):
+            limit = max(limit, baseline[key] + MIN_DELTA_MS)
+        if result[key] > limit:
+            problems.append(f'{key} {result[key]} > {limit:.1f}')
+    return problems
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('view', list(VIEWS))
+def test_view_performance(dataset, view, baselines, latency_baselines):
+    login, method, url, data = VIEWS[view]
+    client = Client()
+    if login:
+        client.login(username=reader().username, password=PASSWORD)
+    url = url()
+    data = data() if data else None
+
+    def request():
+        # Каждый замер - промах кеша: меряется работа вью.
+        cache.clear()
+        response = getattr(client, method)(url, data)
+        assert response.status_code in (200, 302), response.status_code
+
+    result = measure(request)
+    if os.environ.get('BENCH_UPDATE'):
+        baselines.setdefault(dataset, {})[view] = {
+            key: result[key] for key in SHARED_KEYS
+        }
+        latency_baselines.setdefault(dataset, {})[view] = {
+            key: value for key, value in result.items()
+            if key not in SHARED_KEYS
+        }
+        return
+    baseline = baselines.get(dataset, {}).get(view)
+    if baseline is None:
+        pytest.skip(f'Нет базы для {dataset}/{view}: BENCH_UPDATE=1')
+    baseline = {**baseline, **latency_baselines.get(dataset, {}).get(
+        view, {}
+    )}
+    problems = regressions(result, baseline)
+    assert not problems, f'{dataset}/{view}: ' + ', '.join(problems)
@@ -0,0 +1,68 @@
+"""Преобразование объектов в словари для JSON-ответов API.
+Каждому ресурсу соответствует словарь «поле: функция от объекта»,
+поэтому ?fields= просто выбирает нужные функции и не вычисляет
+остальные поля.
+"""
+
+
+class InvalidFields(Exception):
+    """В ?fields= указаны поля, которых у ресурса нет."""
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _image_url(post):
+    return post.image.url if post.image else None
+
+
+POST_FIELDS = {
+    'id': lambda post: post.pk,
+    'text': lambda post: post.text,
+    'pub_date': lambda post: _isoformat(post.pub_date),
+    'author': lambda post: post.author.username,
+    'group': lambda post: post.group.slug if post.group else None,
+    'image': _image_url,
+    'comment_count': lambda post: post.comment_count,
+}
+
+COMMENT_FIELDS = {
+    'id': lambda comment: comment.pk,
+    'text': lambda comment: comment.text,
+    'created': lambda comment: _isoformat(comment.created),
+    'author': lambda comment: comment.author.username,
+    'post': lambda comment: comment.post_id,
+    'parent': lambda comment: comment.parent_id,
+}
+
+GROUP_FIELDS = {
+    'slug': lambda group: group.slug,
+    'title': lambda group: group.title,
+    'description': lambda group: group.description,
+}
+
+PROFILE_FIELDS = {
+    'username': lambda profile: profile.user.username,
+    'full_name': lambda profile: profile.user.get_full_name(),
+    'post_count': lambda profile: profile.post_count,
+    'follower_count': lambda profile: profile.follower_count,
+    'following_count': lambda profile: profile.following_count,
+}
+
+
+def select_fields(available, requested=None):
+    """Возвращает часть available для строки requested
+    вида 'id,text'. Пустая строка означает все поля.
+    """
+    if not requested:
+        return available
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise InvalidFields(unknown)
+    return {name: available[name] for name in names}
+
+
+def serialize(obj, fields):
+    return {name: getter(obj) for name, getter in fields.items()}
@@ -0,0 +1,138 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiTest(TestCase):
+    """Тесты JSON API"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост {number}'
+            )
+            for number in range(13)
+        ]
+        cls.comment = Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text='Комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_posts_cursor_pagination(self):
+        """Проверка: страницы по курсору покрывают все посты по разу."""
+        url = reverse('api:posts')
+        first = self.client.get(url).json()
+        self.assertEqual(len(first['results']), 10)
+        self.assertIsNone(first['previous'])
+        second = self.client.get(url, {'cursor': first['next']}).json()
+        self.assertEqual(len(second['results']), 3)
+        self.assertIsNone(second['next'])
+        ids = [post['id'] for post in first['results'] + second['results']]
+        self.assertEqual(ids, [post.pk for post in reversed(self.posts)])
+
+    def test_sparse_fields(self):
+        """Проверка: ?fields= оставляет только перечисленные поля,
+        неизвестное поле даёт 400."""
+        response = self.client.get(
+            reverse('api:posts'), {'fields': 'id,author', 'limit': 1}
+        )
+        self.assertEqual(
+            response.json()['results'],
+            [{'id': self.posts[-1].pk, 'author': 'auth'}]
+        )
+        response = self.client.get(reverse('api:posts'), {'fields': 'pwd'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_group_profile_and_comments(self):
+        """Проверка: группа, профиль и комментарии отдают свои данные."""
+        group = self.client.get(
+            reverse('api:group', args=[self.group.slug])
+        ).json()
+        self.assertEqual(group['group']['title'], 'Тестовая группа')
+        profile = self.client.get(
+            reverse('api:profile', args=[self.user.username])
+        ).json()
+        self.assertEqual(profile['profile']['post_count'], 13)
+        comments = self.client.get(
+            reverse('api:comments', args=[self.posts[0].pk])
+        ).json()
+        self.assertEqual(comments['results'][0]['text'], 'Комментарий')
+        response = self.client.get(reverse('api:group', args=['missing']))
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('error', response.json())
+
+    def test_follow_requires_login(self):
+        """Проверка: лента подписок доступна только авторизованному."""
+        self.assertEqual(
+            self.client.get(reverse('api:follow')).status_code, 401
+        )
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.client.force_login(self.reader)
+        response = self.client.get(reverse('api:follow'), {'fields': 'id'})
+        self.assertEqual(
+            response.json()['results'][0], {'id': self.posts[-1].pk}
+        )
+
+    def test_etag_not_modified(self):
+        """Проверка: при совпадении If-None-Match ответ 304."""
+        url = reverse('api:posts')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(author=self.user, text='Новый пост')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_comment_count_is_fresh(self):
+        """Проверка: новый и удалённый комментарий сразу видны
+        в comment_count закешированных лент API."""
+        post = self.posts[0]
+        urls = (
+            reverse('api:posts'),
+            reverse('api:group', args=[self.group.slug]),
+            reverse('api:profile', args=[self.user.username]),
+        )
+        params = {'fields': 'id,comment_count', 'limit': 20}
+
+        def counts():
+            return [
+                next(
+                    item['comment_count']
+                    for item in self.client.get(url, params).json()['results']
+                    if item['id'] == post.pk
+                )
+                for url in urls
+            ]
+
+        self.assertEqual(counts(), [1, 1, 1])
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='Ещё комментарий'
+        )
+        self.assertEqual(counts(), [2, 2, 2])
+        comment.delete()
+        self.assertEqual(counts(), [1, 1, 1])
+
+    def test_posts_without_count_query(self):
+        """Проверка: страница ленты - один запрос без COUNT."""
+        with self.assertNumQueries(1):
+            self.client.get(reverse('api:posts'))
+
+    def test_read_only(self):
+        """Проверка: API не принимает POST."""
+        response = self.client.post(reverse('api:posts'))
+        self.assertEqual(response.status_code, 405)
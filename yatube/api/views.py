@@ -0,0 +1,150 @@
+"""Read-only JSON API для мобильных клиентов.
+Те же данные, что и в posts/views.py, но без рендеринга шаблонов.
+Списки отдаются курсорными страницами CursorPaginator: в ответе
+есть results и токены next/previous для параметра ?cursor=.
+?fields=id,text оставляет в results только перечисленные поля,
+?limit= задаёт размер страницы (не больше API_MAX_LIMIT).
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, set_response_etag
+from django.views.decorators.http import require_safe
+
+from core.cache import cache_versioned
+from core.replicas import read_from_replica
+from posts.counters import profile_for
+from posts.models import Group, Post, User
+from posts.timeline import FEED_KEYS, follow_feed
+from posts.utils import (
+    COMMENT_GENERATION, COMMENT_KEYS, CursorPaginator, FEED_GENERATION,
+    InvalidCursor, profile_generation
+)
+
+from .serializers import (
+    COMMENT_FIELDS, GROUP_FIELDS, InvalidFields, POST_FIELDS, PROFILE_FIELDS,
+    select_fields, serialize
+)
+
+
+class BadRequest(Exception):
+    """Ошибка в параметрах запроса, отдаётся как 400."""
+
+
+def _json(payload, status=200):
+    return JsonResponse(
+        payload, status=status, json_dumps_params={'ensure_ascii': False}
+    )
+
+
+def api_view(view):
+    """Общая обёртка вью API: только GET и HEAD, ошибки параметров
+    и 404 в виде JSON и ETag по содержимому ответа. Если ETag совпал
+    с If-None-Match, клиент получает 304 без тела.
+    """
+    @require_safe
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            response = view(request, *args, **kwargs)
+        except BadRequest as error:
+            return _json({'error': str(error)}, status=400)
+        except Http404:
+            return _json({'error': 'Не найдено'}, status=404)
+        if response.status_code != 200:
+            return response
+        if not response.has_header('ETag'):
+            set_response_etag(response)
+        return get_conditional_response(
+            request, etag=response['ETag'], response=response
+        )
+    return wrapper
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.PAGE_COUNTER_TEN))
+    except ValueError:
+        raise BadRequest('limit должен быть числом')
+    return max(1, min(limit, settings.API_MAX_LIMIT))
+
+
+def _page(request, queryset, fields, keys=('pub_date', 'pk')):
+    """Курсорная страница queryset в виде словаря ответа."""
+    try:
+        fields = select_fields(fields, request.GET.get('fields'))
+    except InvalidFields as error:
+        raise BadRequest(f'Неизвестные поля: {", ".join(error.args[0])}')
+    paginator = CursorPaginator(queryset, _limit(request), keys)
+    try:
+        page = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        raise BadRequest('Неверный cursor')
+    return {
+        'results': [serialize(obj, fields) for obj in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
+
+
+@api_view
+@read_from_replica
+@cache_versioned(
+    settings.CACHE_INDEX_TIME, FEED_GENERATION, COMMENT_GENERATION
+)
+def posts(request):
+    """Лента всех постов, как на главной странице."""
+    queryset = Post.objects.select_related('author', 'group')
+    return _json(_page(request, queryset, POST_FIELDS))
+
+
+@api_view
+@read_from_replica
+@cache_versioned(
+    settings.CACHE_INDEX_TIME, FEED_GENERATION, COMMENT_GENERATION
+)
+def group_posts(request, slug):
+    """Сообщество и его посты."""
+    group = get_object_or_404(Group, slug=slug)
+    queryset = group.groups.select_related('author', 'group')
+    payload = _page(request, queryset, POST_FIELDS)
+    payload['group'] = serialize(group, GROUP_FIELDS)
+    return _json(payload)
+
+
+@api_view
+@read_from_replica
+@cache_versioned(
+    settings.CACHE_INDEX_TIME, FEED_GENERATION, COMMENT_GENERATION,
+    profile_generation
+)
+def profile(request, username):
+    """Профиль автора со счётчиками и его посты."""
+    user = get_object_or_404(
+        User.objects.select_related('profile'), username=username
+    )
+    queryset = user.posts.select_related('author', 'group')
+    payload = _page(request, queryset, POST_FIELDS)
+    payload['profile'] = serialize(profile_for(user), PROFILE_FIELDS)
+    return _json(payload)
+
+
+@api_view
+@read_from_replica
+def comments(request, post_id):
+    """Комментарии к посту, новые первыми."""
+    post = get_object_or_404(Post, pk=post_id)
+    queryset = post.comments.select_related('author')
+    return _json(_page(request, queryset, COMMENT_FIELDS, COMMENT_KEYS))
+
+
+@api_view
+@read_from_replica
+def follow(request):
+    """Лента подписок текущего пользователя."""
+    if not request.user.is_authenticated:
+        return _json({'error': 'Требуется авторизация'}, status=401)
+    queryset = follow_feed(request.user).select_related('author', 'group')
+    return _json(_page(request, queryset, POST_FIELDS, FEED_KEYS))
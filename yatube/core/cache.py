@@ -0,0 +1,138 @@
+"""Версионированный кеш страниц с защитой от cache stampede.
+Ключ кеша включает номер поколения (generation). Когда данные
+меняются, поколение увеличивается, и все старые ключи перестают
+читаться сами, без перебора и удаления. Поэтому TTL можно держать
+большим: он только ограничивает память, а не свежесть.
+
+Пересчёт истёкшего ключа выполняет только один запрос (single-flight,
+блокировка через cache.add), остальные в течение CACHE_STALE_GRACE
+получают прежнее значение. Незадолго до истечения ключ с некоторой
+вероятностью пересчитывается заранее (XFetch), чтобы промах не
+приходился на всех одновременно.
+"""
+import hashlib
+import math
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import note_cache
+
+GENERATION_KEY = 'generation:{}'
+LOCK_KEY = 'lock:{}'
+LOCK_POLL_INTERVAL = 0.05
+
+
+def get_generation(name):
+    """Текущее поколение name; при промахе начинается с текущего
+    времени в мс, чтобы не совпасть с ключами вытесненного поколения.
+    """
+    key = GENERATION_KEY.format(name)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, int(time.time() * 1000), None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(name):
+    """Делает недействительными все ключи поколения name."""
+    key = GENERATION_KEY.format(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        return get_generation(name)
+
+
+def _is_fresh(expires, delta, now):
+    """Проверка XFetch: чем дороже пересчёт (delta) и ближе истечение,
+    тем вероятнее, что запрос возьмётся обновить ключ заранее.
+    """
+    beta = settings.CACHE_EARLY_REFRESH_BETA
+    return now - delta * beta * math.log(1 - random.random()) < expires
+
+
+def _wait_for(key):
+    """Ждёт, пока владелец блокировки положит значение в кеш."""
+    deadline = time.time() + settings.CACHE_LOCK_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_or_compute(key, compute, timeout, cacheable=None):
+    """Возвращает значение key, вычисляя его через compute() не более
+    чем в одном запросе одновременно.
+    cacheable(value) решает, можно ли сохранить результат.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires, delta = entry
+        if _is_fresh(expires, delta, time.time()):
+            note_cache(hit=True)
+            return value
+    note_cache(hit=False)
+    lock_key = LOCK_KEY.format(key)
+    if not cache.add(lock_key, 1, settings.CACHE_LOCK_TIMEOUT):
+        if entry is None:
+            entry = _wait_for(key)
+        if entry is not None:
+            return entry[0]
+    try:
+        started = time.time()
+        value = compute()
+        delta = time.time() - started
+        if cacheable is None or cacheable(value):
+            cache.set(
+                key,
+                (value, started + delta + timeout, delta),
+                timeout + settings.CACHE_STALE_GRACE
+            )
+    finally:
+        cache.delete(lock_key)
+    return value
+
+
+def view_cache_key(request, generations):
+    """Ключ ответа: поколения, пользователь и полный путь запроса."""
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    user_id = request.user.pk if request.user.is_authenticated else 0
+    versions = ':'.join(
+        f'{name}:{get_generation(name)}' for name in generations
+    )
+    return f'view:{versions}:{user_id}:{path}'
+
+
+def _is_cacheable(response):
+    return response.status_code == 200 and not response.streaming
+
+
+def cache_versioned(timeout, *generations):
+    """Кеширует GET-ответ вью в пределах поколений generations.
+    Поколение задаётся строкой или функцией от аргументов вью.
+    В отличие от cache_page, ответ разделён по пользователям: шапка
+    страницы и вкладки ленты зависят от того, кто вошёл.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            names = [
+                name(request, *args, **kwargs) if callable(name) else name
+                for name in generations
+            ]
+            return get_or_compute(
+                view_cache_key(request, names),
+                lambda: view(request, *args, **kwargs),
+                timeout,
+                _is_cacheable
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,97 @@
+"""Варианты картинок для адаптивной вёрстки.
+Каждая картинка нарезается в ширины RESPONSIVE_IMAGE_WIDTHS
+в современных форматах из RESPONSIVE_IMAGE_FORMATS и в JPEG как
+запасном варианте. Форматы, которые не умеет кодировать
+установленный Pillow, пропускаются.
+
+Нарезает варианты только фоновый воркер (posts.thumbnails). Шаблоны
+через build_sources лишь читают готовые миниатюры из key-value store
+sorl-thumbnail и никогда не декодируют картинку во время запроса.
+"""
+import logging
+
+from django.conf import settings
+from PIL import features
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_FORMAT = ('JPEG', 'image/jpeg')
+
+
+class StoredThumbnailBackend(ThumbnailBackend):
+    """Бэкенд sorl-thumbnail, который только ищет миниатюру.
+    Опции и имя файла считаются так же, как в
+    ThumbnailBackend.get_thumbnail, но при промахе возвращается None,
+    а не новая миниатюра.
+    """
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        source = ImageFile(file_)
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+stored = StoredThumbnailBackend()
+
+
+def _supported(image_format):
+    try:
+        return features.check(image_format.lower())
+    except ValueError:
+        return False
+
+
+def image_formats():
+    """Форматы в порядке предпочтения, последним идёт JPEG."""
+    modern = [
+        (image_format, mime)
+        for image_format, mime in settings.RESPONSIVE_IMAGE_FORMATS
+        if _supported(image_format)
+    ]
+    return modern + [FALLBACK_FORMAT]
+
+
+def geometry(width):
+    return f'{width}x{round(width * settings.RESPONSIVE_IMAGE_RATIO)}'
+
+
+def variants():
+    """Все (формат, mime, ширина, геометрия, опции) для одной картинки."""
+    for image_format, mime in image_formats():
+        for width in settings.RESPONSIVE_IMAGE_WIDTHS:
+            options = dict(
+                settings.RESPONSIVE_IMAGE_OPTIONS, format=image_format
+            )
+            yield image_format, mime, width, geometry(width), options
+
+
+def build_sources(image):
+    """Список (mime, srcset) для <picture>; JPEG идёт последним.
+    Если какой-то вариант ещё не нарезан воркером, возвращает пустой
+    список. При ошибке sorl-thumbnail, как и тег {% thumbnail %},
+    пишет её в лог и тоже возвращает пустой список.
+    """
+    srcsets = {}
+    try:
+        for image_format, mime, width, size, options in variants():
+            thumbnail = stored.get_thumbnail(image, size, **options)
+            if thumbnail is None:
+                return []
+            srcsets.setdefault(mime, []).append(f'{thumbnail.url} {width}w')
+    except Exception:
+        logger.exception('Не удалось построить варианты %s', image)
+        return []
+    return [(mime, ', '.join(srcset)) for mime, srcset in srcsets.items()]
@@ -0,0 +1,122 @@
+"""Пропускная способность чтения SQLite при параллельной записи."""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.sqlite import apply_pragmas
+
+# Журнал по умолчанию; busy_timeout, чтобы сравнивать скорость, а не ошибки.
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'busy_timeout': 5000}
+SCHEMA = (
+    'CREATE TABLE post ('
+    'id INTEGER PRIMARY KEY, author_id INTEGER, pub_date REAL, text TEXT)'
+)
+SEED_ROWS = 10000
+
+
+def _connect(path, pragmas):
+    connection = sqlite3.connect(path, timeout=5, check_same_thread=False)
+    apply_pragmas(connection.cursor(), pragmas)
+    return connection
+
+
+def _seed(path, pragmas):
+    connection = _connect(path, pragmas)
+    connection.execute(SCHEMA)
+    connection.execute(
+        'CREATE INDEX post_author ON post (author_id, pub_date)'
+    )
+    connection.executemany(
+        'INSERT INTO post (author_id, pub_date, text) VALUES (?, ?, ?)',
+        ((i % 100, i, 'Тестовый пост ' * 10) for i in range(SEED_ROWS))
+    )
+    connection.commit()
+    connection.close()
+
+
+def _writer(path, pragmas, stop, counts):
+    connection = _connect(path, pragmas)
+    while not stop.is_set():
+        try:
+            connection.execute(
+                'INSERT INTO post (author_id, pub_date, text) '
+                'VALUES (?, ?, ?)', (0, time.time(), 'Новый пост')
+            )
+            connection.commit()
+            counts['writes'] += 1
+        except sqlite3.OperationalError:
+            counts['errors'] += 1
+    connection.close()
+
+
+def _reader(path, pragmas, stop, counts, lock):
+    connection = _connect(path, pragmas)
+    reads = errors = 0
+    while not stop.is_set():
+        try:
+            connection.execute(
+                'SELECT id, text FROM post WHERE author_id = ? '
+                'ORDER BY pub_date DESC LIMIT 10', (reads % 100,)
+            ).fetchall()
+            reads += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    connection.close()
+    with lock:
+        counts['reads'] += reads
+        counts['errors'] += errors
+
+
+def run(pragmas, readers, seconds):
+    """Запускает одного писателя и readers читателей на seconds секунд
+    на свежей базе; возвращает счётчики операций.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.sqlite3')
+        _seed(path, pragmas)
+        counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        stop, lock = threading.Event(), threading.Lock()
+        threads = [threading.Thread(
+            target=_writer, args=(path, pragmas, stop, counts)
+        )] + [
+            threading.Thread(
+                target=_reader, args=(path, pragmas, stop, counts, lock)
+            )
+            for _ in range(readers)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает чтение под записью для журнала по умолчанию '
+        'и для SQLITE_PRAGMAS'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5)
+
+    def handle(self, *args, **options):
+        for label, pragmas in (
+            ('default', DEFAULT_PRAGMAS),
+            ('tuned', settings.SQLITE_PRAGMAS),
+        ):
+            counts = run(pragmas, options['readers'], options['seconds'])
+            seconds = options['seconds']
+            self.stdout.write(
+                f'{label}: {counts["reads"] / seconds:.0f} чтений/с, '
+                f'{counts["writes"] / seconds:.0f} записей/с, '
+                f'ошибок {counts["errors"]}'
+            )
@@ -0,0 +1,232 @@
+"""Метрики запросов в формате Prometheus.
+MetricsMiddleware замеряет каждый запрос: общее время, время и число
+SQL-запросов, время рендеринга шаблонов и попадания в кеш страниц
+(core.cache). Значения складываются в гистограммы в памяти процесса
+с меткой view - именем маршрута, например posts:index. Вью metrics
+отдаёт их в текстовом формате Prometheus; каждый процесс сервера
+отдаёт свои значения, суммирует их Prometheus.
+
+Накладные расходы - несколько вызовов perf_counter и bisect на запрос
+и один execute_wrapper на соединение с базой.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.db import connections
+from django.template.backends.django import (
+    DjangoTemplates, Template, TemplateDoesNotExist, reraise
+)
+
+# Границы корзин гистограмм: секунды и штуки.
+TIME_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+UNMATCHED = 'unmatched'
+
+_state = contextvars.ContextVar('metrics_state', default=None)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        """Пары (граница, число наблюдений не больше границы)."""
+        running = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            running += count
+            yield bound, running
+
+
+# Метрика: (тип, описание, границы корзин для гистограмм).
+METRICS = {
+    'yatube_request_seconds': (
+        'histogram', 'Время обработки запроса, с', TIME_BUCKETS
+    ),
+    'yatube_db_seconds': (
+        'histogram', 'Время SQL-запросов за запрос, с', TIME_BUCKETS
+    ),
+    'yatube_db_queries': (
+        'histogram', 'Число SQL-запросов за запрос', COUNT_BUCKETS
+    ),
+    'yatube_template_seconds': (
+        'histogram', 'Время рендеринга шаблонов за запрос, с', TIME_BUCKETS
+    ),
+    'yatube_responses_total': ('counter', 'Ответы по кодам статуса', None),
+    'yatube_cache_total': (
+        'counter', 'Обращения к кешу страниц: hit или miss', None
+    ),
+}
+
+
+class Registry:
+    """Хранилище метрик процесса: {(метрика, метки): значение}."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def clear(self):
+        with self.lock:
+            self.values = {}
+
+    def observe(self, name, labels, value):
+        key = (name, labels)
+        with self.lock:
+            histogram = self.values.get(key)
+            if histogram is None:
+                histogram = self.values[key] = Histogram(METRICS[name][2])
+            histogram.observe(value)
+
+    def increment(self, name, labels, amount=1):
+        key = (name, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        """Текст в формате Prometheus exposition 0.0.4."""
+        with self.lock:
+            items = sorted(
+                (key, value if not isinstance(value, Histogram)
+                 else (list(value.cumulative()), value.total, value.count))
+                for key, value in self.values.items()
+            )
+        lines = []
+        described = set()
+        for (name, labels), value in items:
+            kind, help_text, _ = METRICS[name]
+            if name not in described:
+                described.add(name)
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+            label_text = ','.join(f'{key}="{val}"' for key, val in labels)
+            if kind == 'counter':
+                lines.append(f'{name}{{{label_text}}} {value}')
+                continue
+            buckets, total, count = value
+            for bound, running in buckets:
+                lines.append(
+                    f'{name}_bucket{{{label_text},le="{bound}"}} {running}'
+                )
+            lines.append(f'{name}_sum{{{label_text}}} {total}')
+            lines.append(f'{name}_count{{{label_text}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class RequestMetrics:
+    """Накопленные за один запрос значения."""
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+        self.cache = {'hit': 0, 'miss': 0}
+
+    def timed_execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+def note_cache(hit):
+    """Отмечает попадание или промах кеша в текущем запросе."""
+    state = _state.get()
+    if state is not None:
+        state.cache['hit' if hit else 'miss'] += 1
+
+
+class TimedTemplate(Template):
+    """Шаблон, время рендеринга которого попадает в метрики.
+    Вложенные рендеры ({% include %} через render_to_string)
+    не учитываются повторно."""
+
+    def render(self, context=None, request=None):
+        state = _state.get()
+        if state is None:
+            return super().render(context, request)
+        state.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            state.template_depth -= 1
+            if not state.template_depth:
+                state.template_seconds += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Бэкенд DjangoTemplates, возвращающий TimedTemplate."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class MetricsMiddleware:
+    """Замеряет запрос и записывает результат в registry."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RequestMetrics()
+        token = _state.set(state)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(state.timed_execute)
+                    )
+                response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        elapsed = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else None) or UNMATCHED
+        labels = (('view', view),)
+        registry.observe('yatube_request_seconds', labels, elapsed)
+        registry.observe('yatube_db_seconds', labels, state.db_seconds)
+        registry.observe('yatube_db_queries', labels, state.queries)
+        registry.observe(
+            'yatube_template_seconds', labels, state.template_seconds
+        )
+        registry.increment(
+            'yatube_responses_total',
+            labels + (('status', str(response.status_code)),)
+        )
+        for result, count in state.cache.items():
+            if count:
+                registry.increment(
+                    'yatube_cache_total', labels + (('result', result),),
+                    count
+                )
+        return response
@@ -0,0 +1,96 @@
+"""Журнал медленных и повторяющихся SQL-запросов.
+QueryLogMiddleware включается настройкой QUERY_LOG_ENABLED. В выбранных
+запросах (доля QUERY_LOG_SAMPLE_RATE) каждый SQL-запрос проходит через
+execute_wrapper: запросы дольше QUERY_LOG_SLOW_MS попадают в журнал
+сразу, а в конце запроса проверяются отпечатки - если один и тот же
+запрос с разными параметрами выполнился больше
+QUERY_LOG_REPEAT_THRESHOLD раз, это похоже на N+1.
+
+Отпечаток (fingerprint) - SQL без литералов и параметров: запросы,
+отличающиеся только значениями, дают один отпечаток.
+"""
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+NORMALIZERS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def fingerprint(sql):
+    """Нормализует SQL: литералы и параметры заменяются на ?,
+    списки IN (?, ?, ...) - на (...), пробелы схлопываются."""
+    for pattern, replacement in NORMALIZERS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return (match.view_name if match else None) or request.path
+
+
+class QueryRecorder:
+    """Замеры запросов одного HTTP-запроса."""
+
+    def __init__(self, request):
+        self.request = request
+        self.slow_seconds = settings.QUERY_LOG_SLOW_MS / 1000
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            key = fingerprint(sql)
+            self.fingerprints[key] += 1
+            if elapsed >= self.slow_seconds:
+                logger.warning(
+                    'Медленный запрос %.1f мс в %s: %s',
+                    elapsed * 1000, _view_name(self.request), key
+                )
+
+    def report_repeats(self):
+        threshold = settings.QUERY_LOG_REPEAT_THRESHOLD
+        for key, count in self.fingerprints.items():
+            if count > threshold:
+                logger.warning(
+                    'Возможный N+1: %d одинаковых запросов в %s: %s',
+                    count, _view_name(self.request), key
+                )
+
+
+class QueryLogMiddleware:
+    """Подключает QueryRecorder к части запросов."""
+
+    def __init__(self, get_response):
+        if not settings.QUERY_LOG_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.QUERY_LOG_SAMPLE_RATE:
+            return self.get_response(request)
+        recorder = QueryRecorder(request)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        recorder.report_repeats()
+        return response
@@ -0,0 +1,109 @@
+"""Чтение с реплик и запись в основную базу.
+ReplicaRouter отправляет запись в 'default', а чтение - на одну из
+REPLICA_DATABASES, но только внутри вью с декоратором
+read_from_replica. Реплики отстают от основной базы, поэтому после
+любой записи ReplicaMiddleware ставит cookie, и ещё REPLICA_PIN_SECONDS
+все чтения этого клиента идут в 'default' (read-your-writes).
+"""
+import contextvars
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+
+PRIMARY = 'default'
+PIN_COOKIE = 'pin_primary'
+
+_state = contextvars.ContextVar('replica_state', default=None)
+
+
+class RequestState:
+    """Состояние маршрутизации на время одного запроса."""
+
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.replica_allowed = False
+        self.wrote = False
+
+    def use_replica(self):
+        return (
+            self.replica_allowed and not self.pinned and not self.wrote
+        )
+
+
+def _is_primary(alias):
+    """Реплика указывает на тот же файл, что и основная база.
+    Так бывает в тестах, где реплика - зеркало (TEST MIRROR) default:
+    отдельное соединение не увидело бы данных незавершённой транзакции.
+    """
+    name = settings.DATABASES.get(alias, {}).get('NAME')
+    return name == settings.DATABASES[PRIMARY]['NAME']
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not settings.REPLICA_DATABASES:
+            return PRIMARY
+        if state.use_replica():
+            alias = random.choice(settings.REPLICA_DATABASES)
+            return PRIMARY if _is_primary(alias) else alias
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REPLICA_DATABASES
+
+
+def read_from_replica(view):
+    """Разрешает вью читать с реплик, если клиент не закреплён
+    за основной базой."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        state = _state.get()
+        if state is None:
+            return view(request, *args, **kwargs)
+        state.replica_allowed = True
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            state.replica_allowed = False
+    return wrapper
+
+
+class ReplicaMiddleware:
+    """Открывает состояние маршрутизации на запрос и закрепляет
+    клиента за основной базой после записи."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        state = RequestState(pinned=pinned_until > time.time())
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and settings.REPLICA_DATABASES:
+            response.set_cookie(
+                PIN_COOKIE,
+                str(time.time() + settings.REPLICA_PIN_SECONDS),
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
@@ -0,0 +1,27 @@
+"""Настройка соединений SQLite.
+По умолчанию SQLite пишет журнал отката (journal_mode=DELETE): пишущая
+транзакция блокирует всех читателей. В режиме WAL читатели работают
+параллельно с одним писателем, а synchronous=NORMAL делает fsync
+только на checkpoint, а не на каждый коммит. busy_timeout заставляет
+писателей ждать блокировку вместо немедленного «database is locked».
+
+PRAGMA задаются в SQLITE_PRAGMAS и применяются к каждому новому
+соединению через сигнал connection_created.
+"""
+from django.conf import settings
+
+
+def apply_pragmas(cursor, pragmas=None):
+    """Выполняет PRAGMA из pragmas (по умолчанию SQLITE_PRAGMAS)."""
+    if pragmas is None:
+        pragmas = settings.SQLITE_PRAGMAS
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Обработчик connection_created для соединений SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor)
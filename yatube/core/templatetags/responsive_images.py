@@ -0,0 +1,28 @@
+from django import template
+from django.conf import settings
+from sorl.thumbnail.images import ImageFile
+
+from core.images import build_sources
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/responsive_image.html')
+def responsive_image(image, css_class='card-img my-2'):
+    """Выводит <picture> с srcset во всех форматах и ширинах.
+    Заменяет {% thumbnail %}: браузер сам выбирает формат и размер.
+    Пока воркер не нарезал миниатюры, выводит исходную картинку.
+    """
+    if not image:
+        return {}
+    sources = build_sources(image)
+    if not sources:
+        return {'src': ImageFile(image).url, 'css_class': css_class}
+    *modern, (fallback_mime, fallback_srcset) = sources
+    return {
+        'sources': modern,
+        'srcset': fallback_srcset,
+        'src': fallback_srcset.split(', ')[-1].rsplit(' ', 1)[0],
+        'sizes': settings.RESPONSIVE_IMAGE_SIZES,
+        'css_class': css_class,
+    }
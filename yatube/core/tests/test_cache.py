@@ -0,0 +1,70 @@
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from core.cache import (
+    LOCK_KEY, bump_generation, get_generation, get_or_compute
+)
+
+
+@override_settings(
+    CACHE_STALE_GRACE=30,
+    CACHE_LOCK_TIMEOUT=0.1,
+    CACHE_EARLY_REFRESH_BETA=1.0,
+)
+class GetOrComputeTest(SimpleTestCase):
+    """Тест кеша с защитой от cache stampede"""
+    key = 'test:key'
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self, value='value'):
+        self.calls += 1
+        return value
+
+    def put(self, value, expires, delta=0):
+        cache.set(self.key, (value, expires, delta), 60)
+
+    def test_fresh_value_is_not_recomputed(self):
+        """Проверка: свежее значение отдаётся без пересчёта"""
+        get_or_compute(self.key, self.compute, 60)
+        self.assertEqual(get_or_compute(self.key, self.compute, 60), 'value')
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_value_is_served_while_locked(self):
+        """Проверка: пока ключ пересчитывает другой запрос,
+        отдаётся устаревшее значение."""
+        self.put('stale', time.time() - 1)
+        cache.add(LOCK_KEY.format(self.key), 1, 10)
+        value = get_or_compute(self.key, lambda: self.compute('new'), 60)
+        self.assertEqual(value, 'stale')
+        self.assertEqual(self.calls, 0)
+
+    def test_lock_owner_refreshes_stale_value(self):
+        """Проверка: истёкшее значение пересчитывается и блокировка
+        снимается."""
+        self.put('stale', time.time() - 1)
+        value = get_or_compute(self.key, lambda: self.compute('new'), 60)
+        self.assertEqual(value, 'new')
+        self.assertIsNone(cache.get(LOCK_KEY.format(self.key)))
+
+    @override_settings(CACHE_EARLY_REFRESH_BETA=1000.0)
+    def test_expensive_value_is_refreshed_early(self):
+        """Проверка: дорогое значение обновляется до истечения"""
+        self.put('old', time.time() + 5, delta=1)
+        value = get_or_compute(self.key, lambda: self.compute('new'), 60)
+        self.assertEqual(value, 'new')
+
+    def test_uncacheable_value_is_not_stored(self):
+        """Проверка: cacheable=False не сохраняет значение"""
+        get_or_compute(self.key, self.compute, 60, lambda value: False)
+        self.assertIsNone(cache.get(self.key))
+
+    def test_bump_generation(self):
+        """Проверка: bump_generation меняет поколение"""
+        before = get_generation('feed')
+        self.assertEqual(bump_generation('feed'), before + 1)
+        self.assertEqual(get_generation('feed'), before + 1)
@@ -0,0 +1,79 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from sorl.thumbnail import get_thumbnail
+
+from core.images import image_formats, variants
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ResponsiveImageTest(TestCase):
+    """Тест тега {% responsive_image %}"""
+    small_gif = (
+        b'\x47\x49\x46\x38\x39\x61\x02\x00'
+        b'\x01\x00\x80\x00\x00\x00\x00\x00'
+        b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+        b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+        b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+        b'\x0A\x00\x3B'
+    )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def render(self, image):
+        template = Template(
+            '{% load responsive_images %}{% responsive_image image %}'
+        )
+        return template.render(Context({'image': image}))
+
+    def save_image(self):
+        name = default_storage.save(
+            'posts/small.gif', ContentFile(self.small_gif)
+        )
+        return default_storage.open(name)
+
+    def test_picture_has_srcset_for_every_width(self):
+        """Проверка: тег выводит <picture> со всеми ширинами"""
+        image = self.save_image()
+        for *_, size, options in variants():
+            get_thumbnail(image, size, **options)
+        html = self.render(image)
+        self.assertIn('<picture>', html)
+        for width in settings.RESPONSIVE_IMAGE_WIDTHS:
+            with self.subTest(width=width):
+                self.assertIn(f' {width}w', html)
+
+    def test_missing_thumbnails_fall_back_to_original(self):
+        """Проверка: без нарезанных миниатюр тег выводит исходную
+        картинку и не нарезает её сам"""
+        image = self.save_image()
+        with mock.patch('sorl.thumbnail.default.engine.get_image') as decode:
+            html = self.render(image)
+        decode.assert_not_called()
+        self.assertRegex(html, r'src="[^"]*/small\w*\.gif"')
+        self.assertNotIn('srcset', html)
+
+    def test_empty_image_renders_nothing(self):
+        """Проверка: без картинки тег ничего не выводит"""
+        self.assertEqual(self.render('').strip(), '')
+
+    def test_unsupported_formats_are_skipped(self):
+        """Проверка: форматы без поддержки в Pillow пропускаются,
+        JPEG всегда последний."""
+        with mock.patch('core.images._supported', return_value=False):
+            self.assertEqual(image_formats(), [('JPEG', 'image/jpeg')])
+        with mock.patch('core.images._supported', return_value=True):
+            formats = image_formats()
+        self.assertEqual(formats[0], ('WEBP', 'image/webp'))
+        self.assertEqual(formats[-1], ('JPEG', 'image/jpeg'))
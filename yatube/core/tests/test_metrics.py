@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.metrics import Histogram, registry
+from posts.models import Post
+
+User = get_user_model()
+
+
+class HistogramTest(TestCase):
+    """Тест гистограммы"""
+
+    def test_cumulative_buckets(self):
+        """Проверка: корзины накопительные, значение на границе
+        попадает в её корзину."""
+        histogram = Histogram((1, 5))
+        for value in (0.5, 1, 3, 7):
+            histogram.observe(value)
+        self.assertEqual(
+            list(histogram.cumulative()), [(1, 2), (5, 3), ('+Inf', 4)]
+        )
+        self.assertEqual((histogram.total, histogram.count), (11.5, 4))
+
+
+class MetricsTest(TestCase):
+    """Тест сбора метрик и эндпоинта /metrics"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.client = Client()
+
+    def test_request_metrics_by_view(self):
+        """Проверка: запросы к главной записаны с именем маршрута,
+        SQL, шаблонами и попаданиями в кеш."""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        text = self.client.get(reverse('metrics')).content.decode()
+        view = 'view="posts:index"'
+        self.assertIn(f'yatube_request_seconds_count{{{view}}} 2', text)
+        self.assertIn(
+            f'yatube_responses_total{{{view},status="200"}} 2', text
+        )
+        self.assertIn(f'yatube_cache_total{{{view},result="hit"}} 1', text)
+        self.assertIn(f'yatube_cache_total{{{view},result="miss"}} 1', text)
+        self.assertIn(f'yatube_db_queries_bucket{{{view},le="0"}} 1', text)
+        self.assertIn('# TYPE yatube_template_seconds histogram', text)
+        template_sum = next(
+            line for line in text.splitlines()
+            if line.startswith(f'yatube_template_seconds_sum{{{view}}}')
+        )
+        self.assertGreater(float(template_sum.split()[-1]), 0)
+
+    def test_unmatched_and_forbidden(self):
+        """Проверка: 404 учитываются отдельно, чужим адресам
+        /metrics недоступен."""
+        self.client.get('/missing-page/')
+        text = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('view="unmatched",status="404"', text)
+        with override_settings(METRICS_ALLOWED_IPS=[]):
+            response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 403)
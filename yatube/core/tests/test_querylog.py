@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.querylog import QueryLogMiddleware, fingerprint
+from posts.models import Post
+
+User = get_user_model()
+
+
+class FingerprintTest(TestCase):
+    """Тест нормализации SQL"""
+
+    def test_values_removed(self):
+        """Проверка: запросы с разными значениями дают один отпечаток."""
+        self.assertEqual(
+            fingerprint(
+                'SELECT "posts_post"."id" FROM "posts_post"\n'
+                "WHERE text = 'it''s' AND id IN (1, 2,3) LIMIT 21"
+            ),
+            'SELECT "posts_post"."id" FROM "posts_post" '
+            'WHERE text = ? AND id IN (...) LIMIT ?'
+        )
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id = %s'),
+            fingerprint('SELECT * FROM t WHERE id = 42'),
+        )
+
+
+@override_settings(
+    QUERY_LOG_ENABLED=True,
+    QUERY_LOG_SAMPLE_RATE=1.0,
+    QUERY_LOG_REPEAT_THRESHOLD=3,
+    QUERY_LOG_SLOW_MS=10000,
+)
+class QueryLogMiddlewareTest(TestCase):
+    """Тест журнала медленных запросов и N+1"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        for number in range(5):
+            Post.objects.create(author=cls.user, text=f'Пост {number}')
+
+    def n_plus_one(self, request):
+        for post in Post.objects.all():
+            post.author.username
+        return HttpResponse()
+
+    def test_repeated_queries_logged(self):
+        """Проверка: пять одинаковых запросов автора - N+1."""
+        middleware = QueryLogMiddleware(self.n_plus_one)
+        with self.assertLogs('core.querylog', 'WARNING') as logs:
+            middleware(RequestFactory().get('/feed/'))
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('5 одинаковых запросов в /feed/', logs.output[0])
+
+    def test_slow_queries_logged(self):
+        """Проверка: запрос дольше порога попадает в журнал."""
+        middleware = QueryLogMiddleware(self.n_plus_one)
+        with override_settings(QUERY_LOG_SLOW_MS=0):
+            with self.assertLogs('core.querylog', 'WARNING') as logs:
+                middleware(RequestFactory().get('/feed/'))
+        self.assertEqual(
+            sum('Медленный запрос' in line for line in logs.output), 6
+        )
+
+    def test_disabled_and_unsampled(self):
+        """Проверка: выключенный журнал не подключается, запросы
+        вне выборки не замеряются."""
+        with override_settings(QUERY_LOG_ENABLED=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                QueryLogMiddleware(self.n_plus_one)
+        middleware = QueryLogMiddleware(self.n_plus_one)
+        with override_settings(QUERY_LOG_SAMPLE_RATE=0):
+            with self.assertRaises(AssertionError):
+                with self.assertLogs('core.querylog', 'WARNING'):
+                    middleware(RequestFactory().get('/feed/'))
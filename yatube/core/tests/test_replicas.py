@@ -0,0 +1,178 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core.replicas import (
+    PIN_COOKIE, PRIMARY, ReplicaMiddleware, ReplicaRouter, read_from_replica
+)
+
+User = get_user_model()
+
+
+@override_settings(REPLICA_DATABASES=['replica_test'])
+class ReplicaRouterTest(TestCase):
+    """Тест маршрутизации чтения на реплики"""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        self.routed = []
+
+    def run_request(self, view, cookies=None):
+        request = self.factory.get('/')
+        request.COOKIES.update(cookies or {})
+        return ReplicaMiddleware(view)(request)
+
+    def read_view(self, request):
+        self.routed.append(self.router.db_for_read(User))
+        return HttpResponse()
+
+    def test_reads_outside_replica_views_use_primary(self):
+        """Проверка: без декоратора чтение идёт в основную базу"""
+        self.run_request(self.read_view)
+        self.assertEqual(self.routed, [PRIMARY])
+        self.assertEqual(self.router.db_for_read(User), PRIMARY)
+
+    def test_replica_view_reads_from_replica(self):
+        """Проверка: вью с read_from_replica читает с реплики"""
+        self.run_request(read_from_replica(self.read_view))
+        self.assertEqual(self.routed, ['replica_test'])
+
+    def test_write_pins_client_to_primary(self):
+        """Проверка: после записи чтение идёт в основную базу,
+        клиент получает cookie закрепления."""
+        @read_from_replica
+        def write_then_read(request):
+            self.router.db_for_write(User)
+            return self.read_view(request)
+
+        response = self.run_request(write_then_read)
+        self.assertEqual(self.routed, [PRIMARY])
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        self.run_request(
+            read_from_replica(self.read_view),
+            {PIN_COOKIE: str(time.time() + 60)}
+        )
+        self.assertEqual(self.routed[-1], PRIMARY)
+
+    def test_replicas_are_not_migrated(self):
+        """Проверка: миграции применяются только к основной базе"""
+        self.assertTrue(self.router.allow_migrate(PRIMARY, 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica_test', 'posts'))
+
+
+@override_settings(REPLICA_DATABASES=[PRIMARY])
+class ReplicaPinViewTest(TestCase):
+    """Тест закрепления клиента после подписки"""
+
+    def test_follow_sets_pin_cookie(self):
+        """Проверка: подписка закрепляет клиента за основной базой"""
+        user = User.objects.create_user(username='reader')
+        author = User.objects.create_user(username='author')
+        self.client.force_login(user)
+        response = self.client.get(
+            reverse('posts:profile_follow', args=[author.username])
+        )
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+
+class ReplicaMirrorTest(TestCase):
+    """Тест реплики, совпадающей с основной базой"""
+
+    def test_mirror_of_primary_routes_to_primary(self):
+        """Проверка: реплика с тем же файлом, что и default,
+        читается через соединение default."""
+        replica = dict(settings.DATABASES[PRIMARY])
+        databases = dict(settings.DATABASES, replica_1=replica)
+        with self.settings(
+            DATABASES=databases, REPLICA_DATABASES=['replica_1']
+        ):
+            routed = []
+
+            @read_from_replica
+            def view(request):
+                routed.append(ReplicaRouter().db_for_read(User))
+                return HttpResponse()
+
+            ReplicaMiddleware(view)(RequestFactory().get('/'))
+        self.assertEqual(routed, [PRIMARY])
+
+
+REPLICA = 'replica_file'
+
+
+@override_settings(REPLICA_DATABASES=[REPLICA])
+class ReplicaFileTest(TestCase):
+    """Тест чтения из отдельного файла SQLite, как в продакшене
+    с YATUBE_REPLICAS. В реплике есть только пользователь replica_only,
+    в основной базе - только primary_only, поэтому по результату
+    чтения видно, в какую базу оно попало.
+    """
+    databases = {PRIMARY, REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        connections.databases[REPLICA] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.directory, 'replica.sqlite3'),
+        }
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(User)
+        # bulk_create не посылает сигналы: профиль реплики не нужен.
+        User.objects.using(REPLICA).bulk_create(
+            [User(username='replica_only')]
+        )
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections.databases[REPLICA]
+        delattr(connections._connections, REPLICA)
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user(username='primary_only')
+
+    def read(self, cookies=None, write=False):
+        usernames = []
+
+        @read_from_replica
+        def view(request):
+            if write:
+                User.objects.filter(username='primary_only').update(
+                    first_name='Записан'
+                )
+            usernames.extend(User.objects.values_list('username', flat=True))
+            return HttpResponse()
+
+        request = RequestFactory().get('/')
+        request.COOKIES.update(cookies or {})
+        return usernames, ReplicaMiddleware(view)(request)
+
+    def test_unpinned_read_returns_replica_data(self):
+        """Проверка: без закрепления вью читает данные файла реплики"""
+        usernames, response = self.read()
+        self.assertEqual(usernames, ['replica_only'])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_read_after_write_returns_primary_data(self):
+        """Проверка: чтение после записи и следующий запрос
+        с cookie закрепления видят основную базу"""
+        usernames, response = self.read(write=True)
+        self.assertEqual(usernames, ['primary_only'])
+        pin = response.cookies[PIN_COOKIE].value
+        usernames, _ = self.read({PIN_COOKIE: pin})
+        self.assertEqual(usernames, ['primary_only'])
@@ -0,0 +1,42 @@
+import os
+import sqlite3
+import tempfile
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+
+from core.management.commands.bench_sqlite import run
+from core.sqlite import apply_pragmas
+
+
+class SqlitePragmasTest(TestCase):
+    """Тесты настройки соединений SQLite"""
+
+    def test_connection_has_pragmas(self):
+        """Проверка: соединение Django получило PRAGMA из настроек."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            busy_timeout = cursor.fetchone()[0]
+            cursor.execute('PRAGMA cache_size')
+            cache_size = cursor.fetchone()[0]
+        self.assertEqual(
+            busy_timeout, settings.SQLITE_PRAGMAS['busy_timeout']
+        )
+        self.assertEqual(cache_size, settings.SQLITE_PRAGMAS['cache_size'])
+
+    def test_file_database_switches_to_wal(self):
+        """Проверка: файл базы переводится в режим WAL."""
+        with tempfile.TemporaryDirectory() as directory:
+            db = sqlite3.connect(os.path.join(directory, 'test.sqlite3'))
+            apply_pragmas(db.cursor())
+            mode = db.execute('PRAGMA journal_mode').fetchone()[0]
+            db.close()
+        self.assertEqual(mode, 'wal')
+
+    def test_readers_are_not_blocked_by_writer(self):
+        """Проверка: в WAL чтение идёт параллельно с записью."""
+        counts = run(settings.SQLITE_PRAGMAS, readers=2, seconds=0.3)
+        self.assertGreater(counts['reads'], 0)
+        self.assertGreater(counts['writes'], 0)
+        self.assertEqual(counts['errors'], 0)
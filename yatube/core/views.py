@@ -1,5 +1,9 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import render
 
+from .metrics import registry
+
 
 def page_not_found(request, exception=None):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -11,3 +15,13 @@ def csrf_failure(request, reason=''):
 
 def server_error(request):
     return render(request, 'core/500.html')
+
+
+def metrics(request):
+    """Метрики процесса в текстовом формате Prometheus.
+    Доступны только с адресов METRICS_ALLOWED_IPS."""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4'
+    )
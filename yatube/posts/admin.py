@@ -3,12 +3,14 @@
 from django.contrib import admin
 
 from .models import Post, Group
+from .search import is_available, match_expression, post_text_matches
 
 
 class PostAdmin(admin.ModelAdmin):
     """PostAdmin - метакласс, добавляет функционал админ-панели.
     list_display - перечисляет поля, которые должны отображаться в админке.
-    search_fields - добавляет интерфейс поиска по тексту постов.
+    search_fields - добавляет интерфейс поиска по тексту постов,
+    сам поиск идёт по индексу FTS5 вместо LIKE '%...%'.
     list_filter - Добавляет возможность фильтрации по дате.
     """
     list_display = (
@@ -23,6 +25,13 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = ('group',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not is_available() or not match_expression(search_term):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return queryset.filter(post_text_matches(search_term)), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
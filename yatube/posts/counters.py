@@ -0,0 +1,74 @@
+"""Денормализованные счётчики постов и подписок в Profile
+и комментариев в Post."""
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Post, Profile, User
+
+
+def _count_of(queryset, field, outer='user_id'):
+    """Подзапрос числа строк queryset, сгруппированных по field."""
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef(outer)})
+        .order_by().values(field).annotate(total=Count('pk'))
+        .values('total')
+    ), 0)
+
+
+def rebuild(users=None):
+    """Пересчитывает счётчики пользователей users (по умолчанию всех)
+    и создаёт недостающие профили. Возвращает число профилей.
+    """
+    if users is None:
+        users = User.objects.all()
+    Profile.objects.bulk_create(
+        [Profile(user_id=pk)
+         for pk in users.filter(profile=None).values_list('pk', flat=True)],
+        ignore_conflicts=True
+    )
+    return Profile.objects.filter(user__in=users).update(
+        post_count=_count_of(Post.objects.all(), 'author'),
+        follower_count=_count_of(Follow.objects.all(), 'author'),
+        following_count=_count_of(Follow.objects.all(), 'user'),
+    )
+
+
+def rebuild_comments(posts=None):
+    """Пересчитывает comment_count постов posts (по умолчанию всех).
+    Возвращает число постов.
+    """
+    if posts is None:
+        posts = Post.objects.all()
+    return posts.update(
+        comment_count=_count_of(Comment.objects.all(), 'post', 'pk')
+    )
+
+
+def bump(user_id, field, delta):
+    """Атомарно сдвигает счётчик field пользователя на delta."""
+    profiles = Profile.objects.filter(user_id=user_id)
+    if delta < 0:
+        profiles = profiles.filter(**{f'{field}__gte': -delta})
+    updated = profiles.update(**{field: F(field) + delta})
+    if not updated and delta > 0:
+        rebuild(User.objects.filter(pk=user_id))
+
+
+def bump_comments(post_id, delta):
+    """Атомарно сдвигает comment_count поста на delta.
+    update() не трогает Post.updated, поэтому кеш карточек поста
+    не сбрасывается.
+    """
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comment_count__gte=-delta)
+    posts.update(comment_count=F('comment_count') + delta)
+
+
+def profile_for(user):
+    """Профиль пользователя; отсутствующий создаётся с пересчётом."""
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        rebuild(User.objects.filter(pk=user.pk))
+        return Profile.objects.get(user=user)
@@ -0,0 +1,98 @@
+"""ETag для условных GET-запросов к страницам постов.
+Каждая функция одним лёгким агрегатным запросом собирает то, от чего
+зависит страница: время последней правки постов, число постов и
+комментариев. К этому добавляются параметры страницы, пользователь и
+поколения кеша (core.cache). Если ETag совпал с If-None-Match,
+декоратор condition отвечает 304, не вызывая вью и не рендеря шаблон.
+
+Last-Modified не отдаётся: после удаления самого свежего поста или
+комментария максимум дат уменьшается, и клиент с более поздним
+If-Modified-Since получил бы устаревшую страницу. Число строк в ETag
+такое удаление замечает.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Exists, Max, OuterRef
+
+from core.cache import get_generation
+from .models import Follow, Group, Post, User
+from .utils import FEED_GENERATION, profile_generation
+
+
+def make_etag(request, state, *generations):
+    """Хеш состояния state, поколений generations и всего, от чего
+    ещё зависит ответ: параметров запроса, пользователя и CSRF-cookie
+    (токен формы комментария). Для state=None возвращает None, и вью
+    вызывается как обычно, например чтобы ответить 404.
+    """
+    if state is None:
+        return None
+    user_id = request.user.pk if request.user.is_authenticated else 0
+    raw = repr((
+        state,
+        [get_generation(name) for name in generations],
+        user_id,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+        sorted(request.GET.lists()),
+    ))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def post_detail_etag(request, post_id, comment_id=None):
+    """Пост, имя и счётчик постов автора и комментарии: comment_count
+    и id последнего замечают и новые, и удалённые комментарии.
+    Годится и для фрагментов с комментариями поста (comment_id -
+    ветка, она входит в URL и потому в ключ кеша клиента).
+    """
+    state = (
+        Post.objects.filter(pk=post_id).order_by()
+        .values_list(
+            'updated',
+            'comment_count',
+            'group__title',
+            'author__first_name',
+            'author__last_name',
+            'author__profile__post_count',
+        )
+        .annotate(last=Max('comments__pk'))
+        .first()
+    )
+    return make_etag(request, state, FEED_GENERATION)
+
+
+def group_posts_etag(request, slug):
+    """Группа и её посты."""
+    state = (
+        Group.objects.filter(slug=slug).order_by()
+        .values_list('pk', 'title', 'description')
+        .annotate(posts=Count('groups'), last=Max('groups__updated'))
+        .first()
+    )
+    return make_etag(request, state, FEED_GENERATION)
+
+
+def profile_etag(request, username):
+    """Посты автора, его имя, счётчики и подписка на него."""
+    following = Follow.objects.filter(
+        user=request.user.pk, author=OuterRef('pk')
+    )
+    state = (
+        User.objects.filter(username=username).order_by()
+        .values_list(
+            'pk',
+            'first_name',
+            'last_name',
+            'profile__post_count',
+            'profile__follower_count',
+            'profile__following_count',
+        )
+        .annotate(last=Max('posts__updated'), following=Exists(following))
+        .first()
+    )
+    return make_etag(
+        request,
+        state,
+        FEED_GENERATION,
+        profile_generation(request, username)
+    )
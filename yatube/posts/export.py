@@ -0,0 +1,136 @@
+"""Потоковая выгрузка постов, комментариев и подписок.
+Строки читаются через values_list(...).iterator(chunk_size), поэтому
+память не зависит от размера таблицы: ни модели, ни весь результат
+целиком не создаются. Авторы и группы выгружаются по username и slug,
+чтобы дамп можно было загрузить в другую базу (import_content).
+"""
+import csv
+import json
+import zlib
+from datetime import datetime
+
+from .models import Comment, Follow, Post
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+FORMATS = (NDJSON, CSV)
+
+# Ресурс: (модель, поле даты для --since, {колонка: путь в values_list}).
+RESOURCES = {
+    'posts': (Post, 'updated', {
+        'id': 'pk',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'updated': 'updated',
+        'image': 'image',
+    }),
+    'comments': (Comment, 'created', {
+        'id': 'pk',
+        'post': 'post_id',
+        'author': 'author__username',
+        'text': 'text',
+        'created': 'created',
+        'parent': 'parent_id',
+    }),
+    'follows': (Follow, None, {
+        'id': 'pk',
+        'user': 'user__username',
+        'author': 'author__username',
+    }),
+}
+# Тип строки NDJSON для каждого ресурса.
+TYPES = {'posts': 'post', 'comments': 'comment', 'follows': 'follow'}
+CONTENT_TYPES = {NDJSON: 'application/x-ndjson', CSV: 'text/csv'}
+
+
+class ExportError(Exception):
+    """Выгрузку с такими параметрами выполнить нельзя."""
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def rows(resource, since=None, after_id=None, chunk_size=2000):
+    """Строки ресурса по возрастанию id в виде кортежей.
+    since - только изменённые после этого момента,
+    after_id - только с id больше заданного.
+    """
+    try:
+        model, date_field, columns = RESOURCES[resource]
+    except KeyError:
+        raise ExportError(f'Неизвестный ресурс: {resource}')
+    queryset = model.objects.order_by('pk')
+    if since is not None:
+        if date_field is None:
+            raise ExportError(f'У ресурса {resource} нет даты для since')
+        queryset = queryset.filter(**{f'{date_field}__gt': since})
+    if after_id is not None:
+        queryset = queryset.filter(pk__gt=after_id)
+    return queryset.values_list(*columns.values()).iterator(
+        chunk_size=chunk_size
+    )
+
+
+def ndjson_lines(resource, records):
+    """Строки NDJSON: по объекту JSON с полем type на строку."""
+    names = list(RESOURCES[resource][2])
+    kind = TYPES[resource]
+    for record in records:
+        line = {'type': kind}
+        line.update(zip(names, map(_plain, record)))
+        yield json.dumps(line, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """Файлоподобный объект для csv.writer: возвращает строку
+    вместо записи, чтобы её можно было отдать генератором."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(resource, records):
+    """Строки CSV с заголовком из имён колонок."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(list(RESOURCES[resource][2]))
+    for record in records:
+        yield writer.writerow([_plain(value) for value in record])
+
+
+def export(resources, fmt=NDJSON, since=None, after_id=None,
+           chunk_size=2000):
+    """Возвращает генератор строк выгрузки resources в формате fmt.
+    Параметры проверяются сразу, до начала потока, и ошибки
+    поднимаются как ExportError. В CSV у каждого ресурса свои колонки,
+    поэтому он выгружается по одному ресурсу за раз.
+    """
+    if fmt not in FORMATS:
+        raise ExportError(f'Неизвестный формат: {fmt}')
+    if fmt == CSV and len(resources) != 1:
+        raise ExportError('CSV выгружается по одному ресурсу')
+    lines = ndjson_lines if fmt == NDJSON else csv_lines
+    parts = [
+        lines(resource, rows(resource, since, after_id, chunk_size))
+        for resource in resources
+    ]
+    return (line for part in parts for line in part)
+
+
+def encode(lines, compress=False):
+    """Кодирует строки в UTF-8 и при compress сжимает gzip на лету."""
+    if not compress:
+        for line in lines:
+            yield line.encode()
+        return
+    # wbits=31 - zlib пишет заголовок и контрольную сумму gzip.
+    compressor = zlib.compressobj(wbits=31)
+    for line in lines:
+        chunk = compressor.compress(line.encode())
+        if chunk:
+            yield chunk
+    yield compressor.flush()
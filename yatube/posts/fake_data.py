@@ -0,0 +1,203 @@
+"""Синтетические данные для нагрузочных тестов.
+Генератор воспроизводим: при одинаковом seed получается тот же набор,
+вплоть до дат - они отсчитываются от фиксированной EPOCH, а не от
+текущего момента. Популярность авторов и число подписок подчиняются
+степенному закону, как в настоящих соцсетях: немногие авторы собирают
+большую часть подписчиков и комментариев. Записи пишутся через posts.importer,
+то есть bulk_create пачками с перестройкой счётчиков и лент в конце.
+"""
+import io
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from faker import Faker
+from PIL import Image
+
+from .importer import Importer
+from .models import Group, Post, User
+
+LOCALE = 'ru_RU'
+# Показатель степенного закона популярности авторов.
+POPULARITY_EXPONENT = 1.1
+# Размер пула текстов: Faker медленный, тексты берутся из пула.
+TEXT_POOL_SIZE = 5000
+IMAGE_SIZE = (960, 640)
+# Конец периода набора: все даты лежат до этого момента.
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def zipf_weights(count, exponent=POPULARITY_EXPONENT):
+    """Накопленные веса закона Ципфа для random.choices."""
+    return list(accumulate(1 / rank ** exponent
+                           for rank in range(1, count + 1)))
+
+
+class Generator:
+    """Генератор набора данных.
+    users, posts, comments, groups, images - размеры набора,
+    follows - среднее число подписок на пользователя,
+    days - за сколько дней до EPOCH распределены посты.
+    """
+
+    def __init__(self, seed=0, users=1000, posts=10000, comments=20000,
+                 groups=20, follows=20, images=0, image_ratio=0.1,
+                 days=365, password=None, batch_size=2000):
+        self.rng = random.Random(seed)
+        self.fake = Faker(LOCALE)
+        self.fake.seed_instance(seed)
+        self.seed = seed
+        self.sizes = {
+            'users': users, 'posts': posts, 'comments': comments,
+            'groups': groups, 'follows': follows, 'images': images,
+        }
+        self.image_ratio = image_ratio
+        self.days = days
+        self.password = password
+        self.batch_size = batch_size
+        self.start = EPOCH - timedelta(days=days)
+
+    def create_users(self):
+        """Создаёт пользователей и возвращает их username.
+        Все получают один и тот же пароль: хеш считается один раз.
+        """
+        password = make_password(self.password)
+        first = (User.objects.order_by('-pk')
+                 .values_list('pk', flat=True).first() or 0) + 1
+        usernames = []
+        batch = []
+        for number in range(first, first + self.sizes['users']):
+            username = f'{self.fake.user_name()}{number}'
+            batch.append(User(
+                username=username,
+                first_name=self.fake.first_name()[:30],
+                last_name=self.fake.last_name()[:150],
+                email=f'{username}@{self.fake.free_email_domain()}',
+                password=password,
+            ))
+            usernames.append(username)
+            if len(batch) >= self.batch_size:
+                User.objects.bulk_create(batch)
+                batch = []
+        User.objects.bulk_create(batch)
+        return usernames
+
+    def create_groups(self):
+        first = (Group.objects.order_by('-pk')
+                 .values_list('pk', flat=True).first() or 0) + 1
+        groups = [
+            Group(
+                title=self.fake.catch_phrase()[:200],
+                slug=f'group-{number}',
+                description=self.fake.paragraph(),
+            )
+            for number in range(first, first + self.sizes['groups'])
+        ]
+        Group.objects.bulk_create(groups)
+        return [group.slug for group in groups]
+
+    def create_images(self):
+        """Сохраняет пул картинок-градиентов и возвращает их имена."""
+        names = []
+        for number in range(self.sizes['images']):
+            colors = [tuple(self.rng.randrange(256) for _ in range(3))
+                      for _ in range(2)]
+            image = Image.new('RGB', (2, 1))
+            image.putdata(colors)
+            image = image.resize(IMAGE_SIZE, Image.BILINEAR)
+            buffer = io.BytesIO()
+            image.save(buffer, 'JPEG', quality=85)
+            names.append(default_storage.save(
+                f'posts/fake_{self.seed}_{number}.jpg',
+                ContentFile(buffer.getvalue())
+            ))
+        return names
+
+    def _pub_date(self, index):
+        """Дата поста index: посты равномерно растут по времени."""
+        step = self.days * 86400 / max(self.sizes['posts'], 1)
+        return self.start + timedelta(seconds=index * step)
+
+    def records(self, usernames, slugs, images):
+        """Строки для Importer: посты, комментарии, подписки."""
+        rng = self.rng
+        texts = [self.fake.paragraph(nb_sentences=rng.randint(1, 6))
+                 for _ in range(TEXT_POOL_SIZE)]
+        # Активность (сколько пишет) и популярность (сколько подписчиков)
+        # распределены по Ципфу, но независимо: иначе самые плодовитые
+        # авторы были бы и самыми читаемыми, и ленты раздувались бы.
+        weights = zipf_weights(len(usernames))
+        writers = usernames[:]
+        rng.shuffle(writers)
+        authors = usernames[:]
+        rng.shuffle(authors)
+        first_post = (Post.objects.order_by('-pk')
+                      .values_list('pk', flat=True).first() or 0) + 1
+        posts_of = defaultdict(list)
+        for index in range(self.sizes['posts']):
+            author = rng.choices(writers, cum_weights=weights)[0]
+            posts_of[author].append(index)
+            record = {
+                'type': 'post',
+                'id': first_post + index,
+                'author': author,
+                'text': rng.choice(texts),
+                'pub_date': self._pub_date(index).isoformat(),
+            }
+            if slugs and rng.random() < 0.5:
+                record['group'] = rng.choice(slugs)
+            if images and rng.random() < self.image_ratio:
+                record['image'] = rng.choice(images)
+            yield record
+        # Комментируют посты популярных авторов: автор поста выбирается
+        # по той же популярности, что и цели подписок.
+        commented = [author for author in authors if author in posts_of]
+        popularity = zipf_weights(len(commented))
+        for _ in range(self.sizes['comments'] if commented else 0):
+            author = rng.choices(commented, cum_weights=popularity)[0]
+            index = rng.choice(posts_of[author])
+            created = self._pub_date(index) + timedelta(
+                seconds=rng.expovariate(1 / 3600)
+            )
+            yield {
+                'type': 'comment',
+                'post': first_post + index,
+                'author': rng.choices(writers, cum_weights=weights)[0],
+                'text': rng.choice(texts)[:300],
+                'created': min(created, EPOCH).isoformat(),
+            }
+        yield from self.follows(usernames, authors, weights)
+
+    def follows(self, usernames, authors, weights):
+        """Число подписок у пользователя - по Парето со средним
+        около follows, цели - по популярности авторов."""
+        average = self.sizes['follows']
+        if not average or len(usernames) < 2:
+            return
+        alpha = 2.0
+        scale = average * (alpha - 1) / alpha
+        limit = len(usernames) - 1
+        for username in usernames:
+            count = min(int(scale * self.rng.paretovariate(alpha)), limit)
+            targets = set(self.rng.choices(
+                authors, cum_weights=weights, k=count
+            ))
+            targets.discard(username)
+            for author in targets:
+                yield {'type': 'follow', 'user': username, 'author': author}
+
+    def generate(self, progress=None):
+        """Создаёт весь набор и возвращает статистику Importer."""
+        usernames = self.create_users()
+        slugs = self.create_groups()
+        images = self.create_images()
+        importer = Importer(self.batch_size, progress)
+        stats = importer.load_records(self.records(usernames, slugs, images))
+        stats['users'] = len(usernames)
+        stats['groups'] = len(slugs)
+        return stats
@@ -0,0 +1,212 @@
+"""Граф подписок в памяти процесса.
+Для каждого пользователя хранятся отсортированные массивы id тех, на
+кого он подписан, и его подписчиков (array, 8 байт на ребро вместо
+объекта int в set). Проверка подписки - bisect по массиву, общие
+подписки и рекомендации «друзей друзей» считаются без запросов к базе.
+
+Граф загружается при первом обращении и обновляется сигналами Follow
+в этом процессе после фиксации транзакции, так что откаченные подписки
+в него не попадают. Подписки из других процессов становятся видны при
+перезагрузке, не позже FOLLOW_GRAPH_MAX_AGE секунд. Перезагрузка идёт
+в фоновом потоке: запросы тем временем читают прежний граф.
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Follow
+
+TYPECODE = 'q'
+
+_lock = threading.Lock()
+# Упорядочивает изменения из сигналов и подмену графа.
+_changes_lock = threading.Lock()
+_graph = None
+# Изменения, зафиксированные во время фоновой перезагрузки: снимок
+# базы мог их не застать, поэтому они повторяются на новом графе.
+_pending = None
+
+
+def _append(index, key, pk):
+    ids = index.get(key)
+    if ids is None:
+        ids = index[key] = array(TYPECODE)
+    ids.append(pk)
+
+
+def _contains(ids, pk):
+    index = bisect_left(ids, pk)
+    return index < len(ids) and ids[index] == pk
+
+
+def _insert(ids, pk):
+    index = bisect_left(ids, pk)
+    if index < len(ids) and ids[index] == pk:
+        return False
+    ids.insert(index, pk)
+    return True
+
+
+def _remove(ids, pk):
+    index = bisect_left(ids, pk)
+    if index < len(ids) and ids[index] == pk:
+        del ids[index]
+
+
+class FollowGraph:
+    """Списки смежности графа подписок."""
+    EMPTY = array(TYPECODE)
+
+    def __init__(self, edges=()):
+        """edges - пары (user_id, author_id), отсортированные по обоим
+        полям: тогда массивы подписок строятся простым append.
+        """
+        self.following = {}
+        self.followers = {}
+        self.loaded = time.monotonic()
+        # Подписчики автора тоже приходят по возрастанию user_id:
+        # пары отсортированы по нему в первую очередь.
+        for user_id, author_id in edges:
+            _append(self.following, user_id, author_id)
+            _append(self.followers, author_id, user_id)
+
+    @classmethod
+    def load(cls):
+        return cls(
+            Follow.objects.order_by('user_id', 'author_id')
+            .values_list('user_id', 'author_id').iterator()
+        )
+
+    def is_stale(self):
+        return time.monotonic() - self.loaded > settings.FOLLOW_GRAPH_MAX_AGE
+
+    def add(self, user_id, author_id):
+        if _insert(self.following.setdefault(user_id, array(TYPECODE)),
+                   author_id):
+            _insert(self.followers.setdefault(author_id, array(TYPECODE)),
+                    user_id)
+
+    def remove(self, user_id, author_id):
+        _remove(self.following.get(user_id, self.EMPTY), author_id)
+        _remove(self.followers.get(author_id, self.EMPTY), user_id)
+
+    def following_of(self, user_id):
+        """Отсортированные id авторов, на которых подписан user_id."""
+        return self.following.get(user_id, self.EMPTY)
+
+    def followers_of(self, author_id):
+        """Отсортированные id подписчиков author_id."""
+        return self.followers.get(author_id, self.EMPTY)
+
+    def is_following(self, user_id, author_id):
+        return _contains(self.following_of(user_id), author_id)
+
+    def mutuals(self, user_id):
+        """id взаимных подписок: на кого подписан user_id и кто
+        подписан на него. Короткий массив ищется в длинном.
+        """
+        following = self.following_of(user_id)
+        followers = self.followers_of(user_id)
+        if len(following) > len(followers):
+            following, followers = followers, following
+        return [pk for pk in following if _contains(followers, pk)]
+
+    def recommendations(self, user_id, limit=10):
+        """Авторы, на которых подписаны авторы user_id, по убыванию
+        числа таких общих связей, без самого user_id и тех, на кого
+        он уже подписан. Каждый сосед учитывается не дальше
+        FOLLOW_GRAPH_FANOUT своих подписок, чтобы популярные аккаунты
+        не делали ответ медленным.
+        """
+        following = self.following_of(user_id)
+        fanout = settings.FOLLOW_GRAPH_FANOUT
+        scores = Counter()
+        for friend in following:
+            scores.update(self.following_of(friend)[:fanout])
+        scores.pop(user_id, None)
+        for pk in following:
+            scores.pop(pk, None)
+        return [
+            pk for pk, _ in sorted(
+                scores.items(), key=lambda item: (-item[1], item[0])
+            )[:limit]
+        ]
+
+
+def get_graph():
+    """Текущий граф процесса. Первое обращение загружает граф сразу,
+    а устаревший (старше FOLLOW_GRAPH_MAX_AGE) отдаётся как есть и
+    перезагружается в фоне одним потоком.
+    """
+    global _graph
+    graph = _graph
+    if graph is not None and not graph.is_stale():
+        return graph
+    if graph is None:
+        with _lock:
+            if _graph is None:
+                _graph = FollowGraph.load()
+            return _graph
+    if _lock.acquire(blocking=False):
+        try:
+            threading.Thread(target=_reload, daemon=True).start()
+        except Exception:
+            _lock.release()
+            raise
+    return graph
+
+
+def _reload():
+    """Загружает новый граф и подменяет им текущий. Вызывается
+    с захваченным _lock и отпускает его.
+    """
+    global _graph, _pending
+    try:
+        with _changes_lock:
+            _pending = []
+        graph = FollowGraph.load()
+        with _changes_lock:
+            for change in _pending:
+                change(graph)
+            _graph = graph
+    finally:
+        _pending = None
+        connection.close()
+        _lock.release()
+
+
+def reset():
+    """Сбрасывает граф: следующее обращение загрузит его заново."""
+    global _graph
+    _graph = None
+
+
+def _apply(change):
+    """Применяет зафиксированное изменение к текущему графу и, если идёт
+    перезагрузка, запоминает его для нового.
+    """
+    with _changes_lock:
+        if _pending is not None:
+            _pending.append(change)
+        if _graph is not None:
+            change(_graph)
+
+
+def followed(user_id, author_id):
+    """Обработчик подписки: обновляет граф, если он уже загружен,
+    когда транзакция будет зафиксирована.
+    """
+    transaction.on_commit(
+        lambda: _apply(lambda graph: graph.add(user_id, author_id))
+    )
+
+
+def unfollowed(user_id, author_id):
+    transaction.on_commit(
+        lambda: _apply(lambda graph: graph.remove(user_id, author_id))
+    )
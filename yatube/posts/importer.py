@@ -0,0 +1,264 @@
+"""Массовая загрузка контента из NDJSON в формате export_content.
+Строки копятся в буферах и пишутся bulk_create пачками по batch_size,
+каждая пачка - в своей транзакции. Авторы и группы ищутся по username
+и slug в словарях в памяти; недостающие создаются пачкой.
+
+bulk_create не посылает сигналы, поэтому на время загрузки счётчики
+Profile, ленты Timeline и очередь миниатюр не обновляются, а индексы
+Meta.indexes и триггеры FTS5 отключены. После загрузки всё это
+перестраивается за один проход вместо обновления на каждую строку,
+в том числе когда загрузка прервалась после записанных пачек.
+"""
+import json
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.cache import bump_generation
+
+from . import counters, search, threads, timeline
+from .models import Comment, Follow, Group, Post, ThumbnailJob, User
+from .utils import FEED_GENERATION
+
+# Порядок записи пачек: комментарии и подписки ссылаются на посты
+# и пользователей из той же или более ранних пачек.
+KINDS = ('post', 'comment', 'follow')
+INDEXED_MODELS = (Post, Comment, Follow)
+
+
+class ImportFailed(Exception):
+    """Строку или пачку не удалось загрузить."""
+
+
+@contextmanager
+def timestamps_preserved():
+    """Отключает auto_now и auto_now_add, чтобы сохранить даты
+    из выгрузки. Меняет поля моделей на уровне процесса, поэтому
+    годится только для команд, а не для вью.
+    """
+    fields = [
+        field for model in (Post, Comment)
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+@contextmanager
+def indexes_suspended(models=INDEXED_MODELS):
+    """Удаляет Meta.indexes моделей на время загрузки и создаёт их
+    заново после: построить индекс один раз дешевле, чем обновлять
+    его на каждой вставке. Редактор схемы используется без with:
+    в контексте редактор SQLite отключает проверку внешних ключей
+    и не работает внутри транзакции, а для CREATE/DROP INDEX это
+    не нужно.
+    """
+    editor = connection.schema_editor()
+    indexes = [(model, index) for model in models
+               for index in model._meta.indexes]
+    for model, index in indexes:
+        editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        for model, index in indexes:
+            editor.add_index(model, index)
+
+
+def _date(value):
+    if not value:
+        return timezone.now()
+    date = parse_datetime(value)
+    if date is None:
+        raise ImportFailed(f'Неверная дата: {value}')
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
+
+
+def _parse(lines):
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise ImportFailed(f'Строка {number}: неверный JSON')
+        if record.get('type') not in KINDS:
+            raise ImportFailed(
+                f'Строка {number}: неизвестный type {record.get("type")!r}'
+            )
+        yield record
+
+
+class Importer:
+    """Загрузчик строк NDJSON. progress(stats) вызывается после
+    каждой записанной пачки.
+    """
+
+    def __init__(self, batch_size=1000, progress=None):
+        self.batch_size = batch_size
+        self.progress = progress
+        self.users = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.buffers = {kind: [] for kind in KINDS}
+        self.counts = dict.fromkeys(KINDS, 0)
+        self.created = {'users': 0, 'groups': 0}
+        self.authors = set()
+        self.started = time.monotonic()
+
+    def stats(self):
+        rows = sum(self.counts.values())
+        seconds = time.monotonic() - self.started
+        return {
+            **self.counts,
+            **self.created,
+            'rows': rows,
+            'seconds': seconds,
+            'rows_per_second': rows / seconds if seconds else 0,
+        }
+
+    def load(self, lines):
+        """Загружает строки NDJSON lines, см. load_records."""
+        return self.load_records(_parse(lines))
+
+    def load_records(self, records):
+        """Загружает словари records и перестраивает производные данные.
+        Возвращает итоговую статистику stats(). Если загрузка прервана
+        ImportFailed, записанные до этого пачки остаются в базе, и
+        производные данные перестраиваются и для них.
+        """
+        try:
+            with timestamps_preserved(), indexes_suspended(), \
+                    search.index_suspended():
+                for record in records:
+                    kind = record.get('type')
+                    if kind not in self.buffers:
+                        raise ImportFailed(f'Неизвестный type {kind!r}')
+                    self.buffers[kind].append(record)
+                    if len(self.buffers[kind]) >= self.batch_size:
+                        self.flush()
+                self.flush()
+        finally:
+            if any(self.counts.values()):
+                self.rebuild()
+        return self.stats()
+
+    def _create_missing(self):
+        """Создаёт пачкой пользователей и группы, которых нет в базе."""
+        usernames = {
+            record[field] for kind, fields in (
+                ('post', ('author',)),
+                ('comment', ('author',)),
+                ('follow', ('user', 'author')),
+            )
+            for record in self.buffers[kind] for field in fields
+        } - set(self.users)
+        if usernames:
+            User.objects.bulk_create([
+                User(username=username, password=make_password(None))
+                for username in usernames
+            ])
+            self.users.update(User.objects.filter(
+                username__in=usernames
+            ).values_list('username', 'pk'))
+            self.created['users'] += len(usernames)
+        slugs = {
+            record['group'] for record in self.buffers['post']
+            if record.get('group')
+        } - set(self.groups)
+        if slugs:
+            Group.objects.bulk_create([
+                Group(title=slug, slug=slug, description='')
+                for slug in slugs
+            ])
+            self.groups.update(Group.objects.filter(
+                slug__in=slugs
+            ).values_list('slug', 'pk'))
+            self.created['groups'] += len(slugs)
+
+    def _post(self, record):
+        pub_date = _date(record.get('pub_date'))
+        group = record.get('group')
+        return Post(
+            id=record.get('id'),
+            author_id=self.users[record['author']],
+            group_id=self.groups[group] if group else None,
+            text=record['text'],
+            pub_date=pub_date,
+            updated=_date(record['updated'])
+            if record.get('updated') else pub_date,
+            image=record.get('image') or '',
+        )
+
+    def _comment(self, record):
+        return Comment(
+            id=record.get('id'),
+            post_id=record['post'],
+            parent_id=record.get('parent') or None,
+            author_id=self.users[record['author']],
+            text=record.get('text', ''),
+            created=_date(record.get('created')),
+        )
+
+    def _follow(self, record):
+        return Follow(
+            user_id=self.users[record['user']],
+            author_id=self.users[record['author']],
+        )
+
+    def flush(self):
+        """Записывает все буферы одной транзакцией."""
+        if not any(self.buffers.values()):
+            return
+        try:
+            with transaction.atomic():
+                self._create_missing()
+                posts = [self._post(record)
+                         for record in self.buffers['post']]
+                Post.objects.bulk_create(posts)
+                Comment.objects.bulk_create(
+                    [self._comment(record)
+                     for record in self.buffers['comment']]
+                )
+                follows = [self._follow(record)
+                           for record in self.buffers['follow']]
+                Follow.objects.bulk_create(follows, ignore_conflicts=True)
+        except KeyError as error:
+            raise ImportFailed(f'Нет поля {error}')
+        except DatabaseError as error:
+            raise ImportFailed(f'Ошибка записи пачки: {error}')
+        self.authors.update(post.author_id for post in posts)
+        self.authors.update(follow.author_id for follow in follows)
+        for kind in KINDS:
+            self.counts[kind] += len(self.buffers[kind])
+            self.buffers[kind] = []
+        if self.progress:
+            self.progress(self.stats())
+
+    def rebuild(self):
+        """Пересчитывает то, что обычно обновляют сигналы."""
+        counters.rebuild()
+        counters.rebuild_comments()
+        threads.fill_paths()
+        timeline.refresh_authors(self.authors)
+        ThumbnailJob.objects.bulk_create(
+            [ThumbnailJob(post_id=pk) for pk in Post.objects.filter(
+                thumbnail_job=None
+            ).exclude(image='').values_list('pk', flat=True).iterator()],
+            ignore_conflicts=True
+        )
+        bump_generation(FEED_GENERATION)
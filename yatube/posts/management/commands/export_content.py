@@ -0,0 +1,60 @@
+"""Потоковая выгрузка контента в NDJSON или CSV."""
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from posts import export
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты, комментарии и подписки в NDJSON или CSV '
+        'с постоянным расходом памяти'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'resources', nargs='*', default=list(export.RESOURCES),
+            help='posts, comments, follows (по умолчанию все)'
+        )
+        parser.add_argument(
+            '--format', choices=export.FORMATS, default=export.NDJSON
+        )
+        parser.add_argument(
+            '--since', help='Только изменённые после даты ISO 8601'
+        )
+        parser.add_argument(
+            '--after-id', type=int, help='Только с id больше заданного'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Сколько строк читать из базы за раз'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true', help='Сжимать вывод gzip'
+        )
+        parser.add_argument(
+            '--output', '-o', help='Файл для записи (по умолчанию stdout)'
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(f'Неверная дата: {options["since"]}')
+        try:
+            lines = export.export(
+                options['resources'], options['format'], since,
+                options['after_id'], options['chunk_size']
+            )
+        except export.ExportError as error:
+            raise CommandError(error)
+        chunks = export.encode(lines, options['gzip'])
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                output.writelines(chunks)
+        else:
+            sys.stdout.buffer.writelines(chunks)
+            sys.stdout.buffer.flush()
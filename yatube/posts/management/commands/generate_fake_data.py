@@ -0,0 +1,70 @@
+"""Генерация синтетического набора данных для нагрузочных тестов."""
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.fake_data import Generator
+
+PROGRESS_INTERVAL = 5
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт воспроизводимый набор пользователей, групп, постов, '
+        'комментариев и подписок со степенным распределением'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок на пользователя'
+        )
+        parser.add_argument(
+            '--images', type=int, default=0,
+            help='Сколько разных картинок создать'
+        )
+        parser.add_argument(
+            '--image-ratio', type=float, default=0.1,
+            help='Доля постов с картинкой'
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней распределить посты'
+        )
+        parser.add_argument(
+            '--password',
+            help='Пароль всех пользователей (по умолчанию без пароля)'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        last_report = time.monotonic()
+
+        def progress(stats):
+            nonlocal last_report
+            if time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                self.stdout.write(
+                    f'Записано строк: {stats["rows"]}, '
+                    f'{stats["rows_per_second"]:.0f} строк/с'
+                )
+
+        generator = Generator(
+            seed=options['seed'], users=options['users'],
+            posts=options['posts'], comments=options['comments'],
+            groups=options['groups'], follows=options['follows'],
+            images=options['images'], image_ratio=options['image_ratio'],
+            days=options['days'], password=options['password'],
+            batch_size=options['batch_size'],
+        )
+        stats = generator.generate(progress)
+        self.stdout.write(
+            f'Пользователей: {stats["users"]}, групп: {stats["groups"]}, '
+            f'постов: {stats["post"]}, комментариев: {stats["comment"]}, '
+            f'подписок: {stats["follow"]}; за {stats["seconds"]:.1f} с'
+        )
@@ -0,0 +1,68 @@
+"""Массовая загрузка контента из NDJSON."""
+import gzip
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importer import Importer, ImportFailed
+
+PROGRESS_INTERVAL = 5
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты, комментарии и подписки из NDJSON '
+        '(формат export_content) пачками через bulk_create'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл NDJSON, можно .gz; - или пусто для stdin'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Строк в одной пачке и транзакции'
+        )
+
+    def report(self, stats):
+        self.stdout.write(
+            f'Загружено строк: {stats["rows"]}, '
+            f'{stats["rows_per_second"]:.0f} строк/с'
+        )
+
+    def handle(self, *args, **options):
+        last_report = time.monotonic()
+
+        def progress(stats):
+            nonlocal last_report
+            if time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                self.report(stats)
+
+        path = options['path']
+        try:
+            if path == '-':
+                source = sys.stdin
+            elif path.endswith('.gz'):
+                source = gzip.open(path, 'rt', encoding='utf-8')
+            else:
+                source = open(path, encoding='utf-8')
+        except OSError as error:
+            raise CommandError(error)
+        importer = Importer(options['batch_size'], progress)
+        try:
+            stats = importer.load(source)
+        except ImportFailed as error:
+            raise CommandError(error)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        self.report(stats)
+        self.stdout.write(
+            f'Постов: {stats["post"]}, комментариев: {stats["comment"]}, '
+            f'подписок: {stats["follow"]}; новых пользователей: '
+            f'{stats["users"]}, групп: {stats["groups"]}; '
+            f'за {stats["seconds"]:.1f} с'
+        )
@@ -0,0 +1,39 @@
+"""Воркер очереди миниатюр ThumbnailJob."""
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит миниатюры картинок постов из очереди. '
+        'Можно запускать несколько воркеров одновременно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь и завершиться'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=2.0,
+            help='Пауза между проверками пустой очереди, сек.'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='Максимум заданий за один проход'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            done, failed = thumbnails.drain(options['limit'])
+            if done or failed:
+                self.stdout.write(
+                    f'Миниатюры: готово {done}, ошибок {failed}'
+                )
+            if options['once']:
+                return
+            if not done and not failed:
+                time.sleep(options['sleep'])
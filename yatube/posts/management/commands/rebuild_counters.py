@@ -0,0 +1,17 @@
+"""Пересчёт денормализованных счётчиков Profile и Post."""
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики постов и подписок в профилях '
+        'и счётчики комментариев постов'
+    )
+
+    def handle(self, *args, **options):
+        total = counters.rebuild()
+        self.stdout.write(f'Пересчитано профилей: {total}')
+        total = counters.rebuild_comments()
+        self.stdout.write(f'Пересчитано постов: {total}')
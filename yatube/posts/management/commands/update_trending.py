@@ -0,0 +1,24 @@
+"""Пересчёт рейтинга популярных постов."""
+from django.core.management.base import BaseCommand
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Сворачивает новые события вовлечённости в рейтинг популярного. '
+        'Запускается по расписанию, например раз в несколько минут.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Построить рейтинг заново по недавним комментариям'
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            events, posts = trending.rebuild()
+        else:
+            events, posts = trending.update()
+        self.stdout.write(f'Событий: {events}, постов в рейтинге: {posts}')
@@ -0,0 +1,67 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_timelines(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    Timeline = apps.get_model('posts', 'Timeline')
+    limit = settings.TIMELINE_FANOUT_LIMIT
+    celebrities = (
+        Follow.objects.values('author')
+        .annotate(followers=models.Count('user'))
+        .filter(followers__gt=limit)
+        .values('author')
+    )
+    Post.objects.filter(author__in=celebrities).update(fanned_out=False)
+    for follow in Follow.objects.exclude(author__in=celebrities).iterator():
+        posts = Post.objects.filter(author_id=follow.author_id)
+        Timeline.objects.bulk_create(
+            [Timeline(user_id=follow.user_id, post_id=pk, pub_date=pub_date)
+             for pk, pub_date in posts.values_list('pk', 'pub_date')],
+            batch_size=settings.TIMELINE_BATCH_SIZE
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0020_auto_20220301_1929'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='group',
+            options={'ordering': ['-title']},
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='fanned_out',
+            field=models.BooleanField(default=True, editable=False, verbose_name='Разослан в ленты подписчиков'),
+        ),
+        migrations.CreateModel(
+            name='Timeline',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='posts.Post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-pub_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timeline',
+            index=models.Index(fields=['user', '-pub_date'], name='timeline_user_pub_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='timeline',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_timeline_entry'),
+        ),
+        migrations.RunPython(fill_timelines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models.functions import Coalesce
+
+
+def fill_profiles(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Post = apps.get_model('posts', 'Post')
+    Follow = apps.get_model('posts', 'Follow')
+    Profile = apps.get_model('posts', 'Profile')
+
+    def count_of(model, field):
+        return Coalesce(models.Subquery(
+            model.objects.filter(**{field: models.OuterRef('user_id')})
+            .order_by().values(field).annotate(total=models.Count('pk'))
+            .values('total')
+        ), 0)
+
+    Profile.objects.bulk_create(
+        [Profile(user_id=pk) for pk in User.objects.values_list('pk', flat=True)]
+    )
+    Profile.objects.update(
+        post_count=count_of(Post, 'author'),
+        follower_count=count_of(Follow, 'author'),
+        following_count=count_of(Follow, 'user'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0021_timeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Profile',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='profile', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+                ('follower_count', models.PositiveIntegerField(default=0, verbose_name='Подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Подписок')),
+            ],
+        ),
+        migrations.RunPython(fill_profiles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+"""Полнотекстовый индекс FTS5 по текстам постов и комментариев.
+Таблицы с внешним содержимым (content=...) хранят только индекс,
+триггеры синхронизируют его при любых INSERT/UPDATE/DELETE,
+в том числе при bulk_create и QuerySet.update().
+"""
+from django.db import migrations
+
+TABLES = (
+    ('posts_post_fts', 'posts_post'),
+    ('posts_comment_fts', 'posts_comment'),
+)
+
+CREATE = (
+    "CREATE VIRTUAL TABLE {fts} USING fts5("
+    "text, content='{table}', content_rowid='id', tokenize='unicode61')",
+    "INSERT INTO {fts}(rowid, text) SELECT id, text FROM {table}",
+    "CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER {fts}_au AFTER UPDATE OF text ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END",
+)
+
+DROP = (
+    'DROP TRIGGER IF EXISTS {fts}_ai',
+    'DROP TRIGGER IF EXISTS {fts}_ad',
+    'DROP TRIGGER IF EXISTS {fts}_au',
+    'DROP TABLE IF EXISTS {fts}',
+)
+
+
+def run_statements(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        with schema_editor.connection.cursor() as cursor:
+            for fts, table in TABLES:
+                for statement in statements:
+                    cursor.execute(statement.format(fts=fts, table=table))
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0024_thumbnailjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_statements(CREATE), run_statements(DROP)
+        ),
+    ]
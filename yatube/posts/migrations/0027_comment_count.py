@@ -0,0 +1,61 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:41
+"""Счётчик комментариев в Post.
+На SQLite AddField пересоздаёт таблицу posts_post и теряет её триггеры
+полнотекстового индекса (0025_search), поэтому после изменения схемы
+в обе стороны они создаются заново.
+"""
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+FTS, TABLE = 'posts_post_fts', 'posts_post'
+
+TRIGGERS = (
+    'DROP TRIGGER IF EXISTS {fts}_ai',
+    'DROP TRIGGER IF EXISTS {fts}_ad',
+    'DROP TRIGGER IF EXISTS {fts}_au',
+    "CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER {fts}_au AFTER UPDATE OF text ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END",
+)
+
+
+def restore_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in TRIGGERS:
+            cursor.execute(statement.format(fts=FTS, table=TABLE))
+
+
+def fill_comment_counts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    Post.objects.update(comment_count=Coalesce(models.Subquery(
+        Comment.objects.filter(post=models.OuterRef('pk'))
+        .order_by().values('post').annotate(total=models.Count('pk'))
+        .values('total')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0026_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_triggers),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.RunPython(fill_comment_counts, migrations.RunPython.noop),
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
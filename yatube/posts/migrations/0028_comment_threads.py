@@ -0,0 +1,84 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:46
+"""Ветки комментариев: parent, path и depth (см. posts.threads).
+Все существующие комментарии становятся корневыми. Как и в 0027,
+на SQLite AddField пересоздаёт таблицу posts_comment, поэтому триггеры
+её полнотекстового индекса создаются заново.
+"""
+from django.db import migrations, models
+import django.db.models.deletion
+
+FTS, TABLE = 'posts_comment_fts', 'posts_comment'
+SEGMENT = 10
+BATCH_SIZE = 1000
+
+TRIGGERS = (
+    'DROP TRIGGER IF EXISTS {fts}_ai',
+    'DROP TRIGGER IF EXISTS {fts}_ad',
+    'DROP TRIGGER IF EXISTS {fts}_au',
+    "CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER {fts}_au AFTER UPDATE OF text ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END",
+)
+
+
+def restore_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in TRIGGERS:
+            cursor.execute(statement.format(fts=FTS, table=TABLE))
+
+
+def fill_paths(apps, schema_editor):
+    Comment = apps.get_model('posts', 'Comment')
+    last = 0
+    while True:
+        pks = list(
+            Comment.objects.filter(pk__gt=last).order_by('pk')
+            .values_list('pk', flat=True)[:BATCH_SIZE]
+        )
+        if not pks:
+            return
+        Comment.objects.bulk_update(
+            [Comment(pk=pk, path=str(pk).zfill(SEGMENT)) for pk in pks],
+            ['path']
+        )
+        last = pks[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0027_comment_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_triggers),
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='posts.Comment'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='comment_post_path_idx'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
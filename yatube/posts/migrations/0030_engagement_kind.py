@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:10
+"""Тип события Engagement. Уже записанные события остаются без типа:
+rebuild их не отбрасывает, следующий update учтёт их как раньше.
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0029_trending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='engagement',
+            name='kind',
+            field=models.CharField(default='', max_length=16),
+            preserve_default=False,
+        ),
+    ]
@@ -20,6 +20,10 @@ class Post(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -40,11 +44,31 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    fanned_out = models.BooleanField(
+        'Разослан в ленты подписчиков',
+        default=True,
+        editable=False
+    )
+    # Обновляется сигналами, пересчитывается командой rebuild_counters.
+    comment_count = models.PositiveIntegerField(
+        'Комментариев',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            models.Index(fields=['author', 'pub_date'],
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=['group', 'pub_date'],
+                         name='post_group_pub_date_idx'),
+            models.Index(fields=['author', 'pub_date'],
+                         name='post_unfanned_author_idx',
+                         condition=models.Q(fanned_out=False)),
+        ]
 
     def __str__(self) -> str:
         return self.text[:15]
@@ -71,6 +95,24 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
         related_name='comments'
     )
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        related_name='replies',
+        blank=True,
+        null=True
+    )
+    # Материализованный путь ветки, см. posts.threads.
+    path = models.CharField(max_length=255, blank=True, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'created'],
+                         name='comment_post_created_idx'),
+            models.Index(fields=['post', 'path'],
+                         name='comment_post_path_idx'),
+        ]
 
 
 class Follow(models.Model):
@@ -90,6 +132,118 @@ class Follow(models.Model):
             models.UniqueConstraint(fields=['user', 'author'],
                                     name='unique_follows')
         ]
+        indexes = [
+            models.Index(fields=['author', 'user'],
+                         name='follow_author_user_idx'),
+        ]
+
+
+class Profile(models.Model):
+    """Profile хранит денормализованные счётчики пользователя,
+    чтобы profile и post_detail не выполняли COUNT(*) на каждый запрос.
+    Счётчики обновляются сигналами, пересчитываются командой
+    rebuild_counters.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='profile'
+    )
+    post_count = models.PositiveIntegerField('Постов', default=0)
+    follower_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+
+    def __str__(self) -> str:
+        return str(self.user)
+
+
+class Timeline(models.Model):
+    """Timeline - материализованная лента подписок пользователя.
+    Строки создаются при публикации поста (fan-out on write),
+    pub_date копируется из поста, чтобы лента читалась
+    одним диапазоном по индексу (user, pub_date, post).
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        ordering = ['-pub_date']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'],
+                                    name='unique_timeline_entry')
+        ]
+        indexes = [
+            models.Index(fields=['user', 'pub_date', 'post'],
+                         name='timeline_user_pub_date_idx')
+        ]
+
+
+class ThumbnailJob(models.Model):
+    """ThumbnailJob - очередь предварительной генерации миниатюр.
+    Задание ставится при сохранении поста с картинкой и выполняется
+    командой process_thumbnails вне цикла запрос-ответ.
+    started - время захвата задания воркером, attempts - число
+    неудачных попыток, error - текст последней ошибки.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='thumbnail_job'
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['created']
+
+
+class Engagement(models.Model):
+    """Engagement - событие вовлечённости для рейтинга популярного
+    (комментарий, подписка на автора поста). События пишутся сигналами
+    и сворачиваются в TrendingScore командой update_trending.
+    kind - ключ TRENDING_WEIGHTS, по нему rebuild отбрасывает события
+    комментариев, которые он и так учтёт.
+    """
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='engagements'
+    )
+    kind = models.CharField(max_length=16)
+    weight = models.FloatField()
+    created = models.DateTimeField(auto_now_add=True)
+
+
+class TrendingScore(models.Model):
+    """TrendingScore - затухающий рейтинг поста к моменту computed.
+    У всех строк computed одинаковый, поэтому score можно сравнивать
+    напрямую. Пересчитывается командой update_trending.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending'
+    )
+    score = models.FloatField()
+    computed = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score'], name='trending_score_idx'),
+        ]
 
 
 class Group(models.Model):
@@ -0,0 +1,147 @@
+"""Полнотекстовый поиск по постам и комментариям.
+Индекс - таблицы FTS5 posts_post_fts и posts_comment_fts
+(миграция 0025_search), ранжирование - по bm25. Пост находится
+и по своему тексту, и по тексту комментариев к нему, но совпадение
+в комментарии весит меньше.
+"""
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+
+TOKEN_RE = re.compile(r'\w+')
+COMMENT_WEIGHT = 0.5
+
+# Индексы FTS5 и проиндексированные таблицы, см. 0025_search.
+FTS_TABLES = (
+    ('posts_post_fts', 'posts_post'),
+    ('posts_comment_fts', 'posts_comment'),
+)
+TRIGGERS = (
+    "CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER {fts}_au AFTER UPDATE OF text ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END",
+)
+DROP_TRIGGERS = (
+    'DROP TRIGGER IF EXISTS {fts}_ai',
+    'DROP TRIGGER IF EXISTS {fts}_ad',
+    'DROP TRIGGER IF EXISTS {fts}_au',
+)
+REBUILD = "INSERT INTO {fts}({fts}) VALUES ('rebuild')"
+
+MATCHES_SQL = '''
+    SELECT rowid AS post_id, bm25(posts_post_fts) AS rank
+    FROM posts_post_fts WHERE posts_post_fts MATCH %s
+    UNION ALL
+    SELECT comment.post_id, bm25(posts_comment_fts) * {weight}
+    FROM posts_comment_fts
+    JOIN posts_comment AS comment ON comment.id = posts_comment_fts.rowid
+    WHERE posts_comment_fts MATCH %s
+'''.format(weight=COMMENT_WEIGHT)
+
+RANKED_SQL = f'''
+    SELECT post_id FROM ({MATCHES_SQL})
+    GROUP BY post_id ORDER BY MIN(rank), post_id DESC
+    LIMIT %s OFFSET %s
+'''
+
+COUNT_SQL = f'SELECT COUNT(DISTINCT post_id) FROM ({MATCHES_SQL})'
+
+
+def match_expression(query):
+    """Превращает ввод пользователя в выражение MATCH без операторов
+    FTS5: все слова обязательны, последнее ищется по префиксу.
+    """
+    tokens = [f'"{token}"' for token in TOKEN_RE.findall(query)]
+    if tokens:
+        tokens[-1] += '*'
+    return ' '.join(tokens)
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def _execute(statements):
+    with connection.cursor() as cursor:
+        for fts, table in FTS_TABLES:
+            for statement in statements:
+                cursor.execute(statement.format(fts=fts, table=table))
+
+
+@contextmanager
+def index_suspended():
+    """Отключает триггеры FTS5 на время массовой загрузки и затем
+    перестраивает индекс целиком одним проходом по таблицам.
+    """
+    if not is_available():
+        yield
+        return
+    _execute(DROP_TRIGGERS)
+    try:
+        yield
+    finally:
+        _execute(TRIGGERS + (REBUILD,))
+
+
+class SearchResults:
+    """Ранжированные результаты поиска, совместимые с Paginator:
+    count() и срезы выполняют по одному запросу к индексу.
+    """
+
+    def __init__(self, query):
+        self.match = match_expression(query)
+
+    def count(self):
+        if not self.match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(COUNT_SQL, [self.match, self.match])
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        if not self.match or key.stop is None or key.stop <= start:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                RANKED_SQL,
+                [self.match, self.match, key.stop - start, start]
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = Post.objects.select_related('author', 'group').in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def search_posts(query):
+    """Посты по запросу query в порядке релевантности.
+    Без FTS5 (не SQLite) - простой поиск по вхождению подстроки.
+    """
+    if is_available():
+        return SearchResults(query)
+    return Post.objects.select_related('author', 'group').filter(
+        Q(text__icontains=query) | Q(comments__text__icontains=query)
+    ).distinct()
+
+
+def post_text_matches(query):
+    """Условие для фильтра Post по индексу текста постов."""
+    return Q(pk__in=RawSQL(
+        'SELECT rowid FROM posts_post_fts WHERE posts_post_fts MATCH %s',
+        [match_expression(query)]
+    ))
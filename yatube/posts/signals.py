@@ -0,0 +1,109 @@
+"""Обработчики сигналов приложения posts signals.py"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.cache import bump_generation
+
+from . import counters, graph, thumbnails, threads, timeline, trending
+from .models import Comment, Follow, Group, Post, Profile, User
+from .utils import COMMENT_GENERATION, FEED_GENERATION, PROFILE_GENERATION
+
+
+@receiver(post_save, sender=User)
+def create_profile(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Profile.objects.get_or_create(user=instance)
+
+
+# Поля пользователя, которые выводятся в закешированных лентах.
+NAME_FIELDS = ('first_name', 'last_name')
+
+
+@receiver(pre_save, sender=User)
+def remember_name(sender, instance, raw=False, update_fields=None,
+                  **kwargs):
+    """Запоминает сохранённое имя, чтобы после save понять, менялось ли
+    оно. Сохранения без полей имени (например, last_login при входе)
+    базу не читают.
+    """
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not set(NAME_FIELDS) & update_fields:
+        return
+    instance._saved_name = User.objects.filter(pk=instance.pk).values_list(
+        *NAME_FIELDS
+    ).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_name(sender, instance, **kwargs):
+    saved = instance.__dict__.pop('_saved_name', None)
+    name = tuple(getattr(instance, field) for field in NAME_FIELDS)
+    if saved is not None and saved != name:
+        bump_generation(FEED_GENERATION)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_feeds(sender, **kwargs):
+    bump_generation(FEED_GENERATION)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_profiles(sender, instance, **kwargs):
+    for user in (instance.user, instance.author):
+        bump_generation(PROFILE_GENERATION.format(user.username))
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.bump(instance.author_id, 'post_count', 1)
+        timeline.fan_out_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def enqueue_thumbnails(sender, instance, raw=False, **kwargs):
+    if instance.image and not raw:
+        thumbnails.enqueue(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.bump(instance.author_id, 'post_count', -1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        threads.assign_path(instance)
+        counters.bump_comments(instance.post_id, 1)
+        trending.record(instance.post_id, 'comment')
+        bump_generation(COMMENT_GENERATION)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.bump_comments(instance.post_id, -1)
+    bump_generation(COMMENT_GENERATION)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.bump(instance.author_id, 'follower_count', 1)
+        counters.bump(instance.user_id, 'following_count', 1)
+        timeline.backfill(instance.user_id, instance.author_id)
+        graph.followed(instance.user_id, instance.author_id)
+        trending.record_follow(instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.bump(instance.author_id, 'follower_count', -1)
+    counters.bump(instance.user_id, 'following_count', -1)
+    timeline.trim(instance.user_id, instance.author_id)
+    graph.unfollowed(instance.user_id, instance.author_id)
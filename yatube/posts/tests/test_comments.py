@@ -0,0 +1,190 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from posts import threads
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(COMMENTS_PER_PAGE=3)
+class CommentPaginationTest(TestCase):
+    """Тест курсорной паджинации комментариев на странице поста"""
+    total = 7
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Текст')
+        for i in range(cls.total):
+            Comment.objects.create(
+                post=cls.post, author=cls.author, text=f'comment {i}'
+            )
+        cls.detail_url = reverse('posts:post_detail', args=[cls.post.pk])
+        cls.more_url = reverse('posts:comments', args=[cls.post.pk])
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def texts(self, page):
+        return [comment.text for comment in page]
+
+    def test_post_detail_shows_first_page(self):
+        """Проверка: на странице поста только первая порция комментариев
+        и общее число из comment_count"""
+        response = self.client.get(self.detail_url)
+        page = response.context['comments']
+        self.assertEqual(
+            self.texts(page), ['comment 0', 'comment 1', 'comment 2']
+        )
+        self.assertTrue(page.has_next())
+        self.assertContains(response, f'Комментарии: {self.total}')
+        self.assertContains(response, 'Показать ещё')
+
+    def test_load_more_walks_all_comments(self):
+        """Проверка: «Показать ещё» отдаёт фрагмент со следующими
+        комментариями, пока они не закончатся"""
+        response = self.client.get(self.detail_url)
+        cursor = response.context['comments'].next_cursor
+        texts = ['comment 0', 'comment 1', 'comment 2']
+        while cursor:
+            response = self.client.get(self.more_url, {'cursor': cursor})
+            self.assertTemplateUsed(
+                response, 'posts/includes/comment_page.html'
+            )
+            self.assertNotContains(response, '<html')
+            page = response.context['comments']
+            texts += self.texts(page)
+            cursor = page.next_cursor
+        self.assertEqual(texts, [f'comment {i}' for i in range(self.total)])
+
+    def test_comment_queries_do_not_grow(self):
+        """Проверка: авторы комментариев выбираются одним запросом
+        с комментариями, а не по запросу на комментарий"""
+        with self.assertNumQueries(3):
+            self.client.get(self.more_url)
+        other = User.objects.create_user(username='other')
+        Comment.objects.create(post=self.post, author=other, text='other')
+        with self.assertNumQueries(3):
+            self.client.get(self.more_url)
+
+    def test_missing_post_returns_404(self):
+        """Проверка: фрагмент для несуществующего поста отдаёт 404"""
+        response = self.client.get(reverse('posts:comments', args=[10 ** 6]))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(COMMENT_MAX_DEPTH=3, COMMENT_PAGE_DEPTH=2)
+class CommentThreadTest(TestCase):
+    """Тест веток ответов на комментарии"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Текст')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def comment(self, text, parent=None):
+        return Comment.objects.create(
+            post=self.post, author=self.author, text=text, parent=parent
+        )
+
+    def reply(self, parent, text):
+        self.client.post(
+            reverse('posts:add_comment', args=[self.post.pk]),
+            {'text': text, 'parent': parent.pk if parent else ''}
+        )
+        return Comment.objects.get(text=text)
+
+    def test_replies_follow_their_parent(self):
+        """Проверка: путь ставит ответы сразу за родителем,
+        в порядке создания"""
+        first = self.comment('1')
+        second = self.comment('2')
+        reply = self.comment('1.1', first)
+        self.comment('1.1.1', reply)
+        self.comment('1.2', first)
+        self.assertEqual(reply.depth, 1)
+        self.assertTrue(reply.path.startswith(first.path))
+        texts = list(
+            Comment.objects.order_by('path').values_list('text', flat=True)
+        )
+        self.assertEqual(texts, ['1', '1.1', '1.1.1', '1.2', '2'])
+        subtree = threads.subtree(Comment.objects.all(), first)
+        self.assertEqual(
+            sorted(subtree.values_list('text', flat=True)),
+            ['1.1', '1.1.1', '1.2']
+        )
+        self.assertNotIn(second, subtree)
+
+    def test_add_comment_limits_depth(self):
+        """Проверка: ответ глубже COMMENT_MAX_DEPTH встаёт рядом
+        с родителем, а ответ на чужой комментарий - в корень"""
+        root = self.reply(None, 'root')
+        child = self.reply(root, 'child')
+        grandchild = self.reply(child, 'grandchild')
+        deeper = self.reply(grandchild, 'deeper')
+        self.assertEqual(grandchild.depth, 2)
+        self.assertEqual(deeper.parent, child)
+        self.assertEqual(deeper.depth, 2)
+        other = Post.objects.create(author=self.author, text='Другой')
+        stranger = Comment.objects.create(
+            post=other, author=self.author, text='stranger'
+        )
+        self.assertIsNone(self.reply(stranger, 'orphan').parent)
+
+    def test_hidden_replies_load_as_subtree(self):
+        """Проверка: глубокие ответы скрыты на странице поста
+        и подгружаются фрагментом поддерева"""
+        root = self.comment('root')
+        child = self.comment('child', root)
+        self.comment('grandchild', child)
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        page = response.context['comments']
+        self.assertEqual([c.text for c in page], ['root', 'child'])
+        self.assertTrue(page[1].has_hidden_replies)
+        replies_url = reverse(
+            'posts:comment_replies', args=[self.post.pk, child.pk]
+        )
+        self.assertContains(response, replies_url)
+        with self.assertNumQueries(6):
+            response = self.client.get(replies_url)
+        self.assertEqual(
+            [c.text for c in response.context['comments']], ['grandchild']
+        )
+
+    def test_deleting_comment_removes_subtree(self):
+        """Проверка: удаление комментария удаляет его ответы
+        и уменьшает comment_count"""
+        root = self.comment('root')
+        self.comment('child', self.comment('child', root))
+        root.delete()
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(Post.objects.get(pk=self.post.pk).comment_count, 0)
+
+    def test_fill_paths_after_bulk_create(self):
+        """Проверка: fill_paths строит пути комментариев из bulk_create
+        уровень за уровнем"""
+        Comment.objects.bulk_create([
+            Comment(id=900, post=self.post, author=self.author, text='a'),
+            Comment(id=901, post=self.post, author=self.author, text='b',
+                    parent_id=900),
+            Comment(id=902, post=self.post, author=self.author, text='c',
+                    parent_id=901),
+        ])
+        self.assertEqual(threads.fill_paths(batch_size=1), 3)
+        deepest = Comment.objects.get(pk=902)
+        path = ''.join(threads.segment(pk) for pk in (900, 901, 902))
+        self.assertEqual(deepest.path, path)
+        self.assertEqual(deepest.depth, 2)
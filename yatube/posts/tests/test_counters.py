@@ -0,0 +1,70 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import Comment, Follow, Post, Profile
+
+User = get_user_model()
+
+
+class ProfileCountersTest(TestCase):
+    """Тест денормализованных счётчиков Profile"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def profile(self, user):
+        return Profile.objects.get(user=user)
+
+    def test_post_count_follows_create_and_delete(self):
+        """Проверка: post_count меняется при создании и удалении поста"""
+        post = Post.objects.create(author=self.author, text='text')
+        Post.objects.create(author=self.author, text='text')
+        self.assertEqual(self.profile(self.author).post_count, 2)
+        post.delete()
+        self.assertEqual(self.profile(self.author).post_count, 1)
+
+    def test_follow_counts_follow_create_and_delete(self):
+        """Проверка: счётчики подписок меняются при подписке и отписке"""
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.profile(self.author).follower_count, 1)
+        self.assertEqual(self.profile(self.reader).following_count, 1)
+        follow.delete()
+        self.assertEqual(self.profile(self.author).follower_count, 0)
+        self.assertEqual(self.profile(self.reader).following_count, 0)
+
+    def test_rebuild_counters_command(self):
+        """Проверка: rebuild_counters восстанавливает счётчики"""
+        post = Post.objects.create(author=self.author, text='text')
+        Comment.objects.create(post=post, author=self.reader, text='c')
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.update(comment_count=0)
+        Profile.objects.update(
+            post_count=0, follower_count=0, following_count=0
+        )
+        Profile.objects.filter(user=self.reader).delete()
+        call_command('rebuild_counters', stdout=StringIO())
+        author = self.profile(self.author)
+        self.assertEqual(author.post_count, 1)
+        self.assertEqual(author.follower_count, 1)
+        self.assertEqual(self.profile(self.reader).following_count, 1)
+        self.assertEqual(Post.objects.get(pk=post.pk).comment_count, 1)
+
+    def test_comment_count_follows_create_and_delete(self):
+        """Проверка: comment_count меняется при создании и удалении
+        комментария и не трогает Post.updated"""
+        post = Post.objects.create(author=self.author, text='text')
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='c'
+        )
+        Comment.objects.create(post=post, author=self.author, text='c')
+        fresh = Post.objects.get(pk=post.pk)
+        self.assertEqual(fresh.comment_count, 2)
+        self.assertEqual(fresh.updated, post.updated)
+        comment.delete()
+        self.assertEqual(Post.objects.get(pk=post.pk).comment_count, 1)
@@ -0,0 +1,128 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    """Тест ответов 304 Not Modified по ETag"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тайтл', slug='group_slug', description='description'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Текст', group=cls.group
+        )
+        cls.urls = {
+            'post_detail': reverse(
+                'posts:post_detail', kwargs={'post_id': cls.post.pk}
+            ),
+            'group_list': reverse(
+                'posts:group_list', kwargs={'slug': cls.group.slug}
+            ),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': cls.author.username}
+            ),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_unchanged_page_is_not_modified(self):
+        """Повторный запрос с тем же ETag получает пустой 304
+        за один проверочный запрос к базе."""
+        for name, url in self.urls.items():
+            with self.subTest(name=name):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(1):
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=etag
+                    )
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+    def test_new_post_changes_etag(self):
+        """Новый пост автора в группе меняет ETag всех трёх страниц."""
+        etags = {
+            name: self.client.get(url)['ETag']
+            for name, url in self.urls.items()
+        }
+        Post.objects.create(author=self.author, text='Ещё', group=self.group)
+        for name, url in self.urls.items():
+            with self.subTest(name=name):
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[name]
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_comments_change_post_detail_etag(self):
+        """Новый и удалённый комментарий меняют ETag поста, хотя
+        поколения кеша при этом не сдвигаются."""
+        url = self.urls['post_detail']
+        etag = self.client.get(url)['ETag']
+        comment = Comment.objects.create(
+            post=self.post, author=self.reader, text='c'
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        comment.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_author_rename_changes_etag(self):
+        """Новое имя автора меняет ETag поста и профиля, даже без
+        сигналов и сдвига поколений кеша."""
+        urls = {name: self.urls[name] for name in ('post_detail', 'profile')}
+        etags = {name: self.client.get(url)['ETag']
+                 for name, url in urls.items()}
+        User.objects.filter(pk=self.author.pk).update(last_name='Новая')
+        for name, url in urls.items():
+            with self.subTest(name=name):
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[name]
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_page_and_user_change_etag(self):
+        """ETag зависит от номера страницы и пользователя."""
+        url = self.urls['group_list']
+        anonymous = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url, {'page': 2})['ETag'],
+                            anonymous)
+        reader = Client()
+        reader.force_login(self.reader)
+        self.assertNotEqual(reader.get(url)['ETag'], anonymous)
+
+    def test_follow_changes_profile_etag(self):
+        """Подписка читателя меняет ETag профиля автора для него."""
+        reader = Client()
+        reader.force_login(self.reader)
+        url = self.urls['profile']
+        etag = reader.get(url)['ETag']
+        Follow.objects.create(user=self.reader, author=self.author)
+        response = reader.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_objects_return_404(self):
+        """Для несуществующих объектов ETag не считается, вью отвечает
+        404."""
+        urls = (
+            reverse('posts:post_detail', kwargs={'post_id': 10 ** 6}),
+            reverse('posts:group_list', kwargs={'slug': 'missing'}),
+            reverse('posts:profile', kwargs={'username': 'missing'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,98 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import export
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ExportTest(TestCase):
+    """Тесты потоковой выгрузки контента"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Первый пост'
+        )
+        cls.second = Post.objects.create(author=cls.user, text='Второй пост')
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def lines(self, *args, **kwargs):
+        return [json.loads(line) for line in export.export(*args, **kwargs)]
+
+    def test_ndjson_contains_all_resources(self):
+        """Проверка: NDJSON содержит посты, комментарии и подписки
+        с username и slug вместо внутренних id."""
+        lines = self.lines(list(export.RESOURCES))
+        self.assertEqual(
+            [line['type'] for line in lines],
+            ['post', 'post', 'comment', 'follow']
+        )
+        self.assertEqual(lines[0]['author'], 'auth')
+        self.assertEqual(lines[0]['group'], 'test-slug')
+        self.assertEqual(lines[3], {
+            'type': 'follow', 'id': lines[3]['id'],
+            'user': 'reader', 'author': 'auth',
+        })
+
+    def test_incremental_filters(self):
+        """Проверка: after_id и since отбирают только новые строки."""
+        lines = self.lines(['posts'], after_id=self.post.pk)
+        self.assertEqual([line['id'] for line in lines], [self.second.pk])
+        lines = self.lines(['posts'], since=self.second.updated)
+        self.assertEqual(lines, [])
+        with self.assertRaises(export.ExportError):
+            export.export(['follows'], since=self.second.updated)
+
+    def test_csv_and_gzip(self):
+        """Проверка: CSV с заголовком, gzip распаковывается обратно."""
+        lines = export.export(['comments'], export.CSV)
+        packed = b''.join(export.encode(lines, compress=True))
+        rows = list(csv.reader(io.StringIO(gzip.decompress(packed).decode())))
+        self.assertEqual(rows[0], list(export.RESOURCES['comments'][2]))
+        self.assertEqual(rows[1][3], 'Комментарий')
+        with self.assertRaises(export.ExportError):
+            export.export(['posts', 'comments'], export.CSV)
+
+    def test_command_writes_file(self):
+        """Проверка: команда export_content пишет сжатый файл."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'dump.ndjson.gz')
+            call_command('export_content', 'posts', '--gzip', '-o', path)
+            with gzip.open(path, 'rt') as dump:
+                self.assertEqual(len(dump.readlines()), 2)
+
+    def test_view_is_staff_only_and_streams(self):
+        """Проверка: выгрузка доступна только персоналу и идёт потоком."""
+        url = reverse('posts:export_content', args=['posts'])
+        client = Client()
+        client.force_login(self.reader)
+        self.assertEqual(client.get(url).status_code, 302)
+        client.force_login(self.staff)
+        response = client.get(url, {'format': 'csv'})
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(body.splitlines()), 3)
+        self.assertEqual(
+            client.get(url, {'format': 'xml'}).status_code, 400
+        )
@@ -0,0 +1,78 @@
+import json
+from collections import Counter
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.fake_data import EPOCH, Generator
+from posts.models import Comment, Follow, Group, Post, Profile, Timeline
+
+User = get_user_model()
+
+DATES = ('pub_date', 'created')
+
+
+class FakeDataTest(TestCase):
+    """Тесты генератора синтетических данных"""
+
+    def records(self, seed, comments=100):
+        generator = Generator(
+            seed=seed, users=50, posts=200, comments=comments
+        )
+        usernames = [f'user{number}' for number in range(50)]
+        return list(generator.records(usernames, ['g'], []))
+
+    def test_same_seed_same_dataset(self):
+        """Проверка: одинаковый seed даёт тот же набор байт в байт,
+        вместе с датами."""
+        dump = json.dumps(self.records(1), ensure_ascii=False)
+        self.assertEqual(json.dumps(self.records(1), ensure_ascii=False),
+                         dump)
+        self.assertNotEqual(self.records(2), self.records(1))
+        self.assertTrue(all(
+            record[key] <= EPOCH.isoformat()
+            for record in self.records(1) for key in DATES if key in record
+        ))
+
+    def test_comments_follow_author_popularity(self):
+        """Проверка: посты популярных авторов комментируют намного
+        чаще среднего, а не пропорционально числу постов автора."""
+        records = self.records(1, comments=2000)
+        author_of = {record['id']: record['author']
+                     for record in records if record['type'] == 'post'}
+        posts = Counter(author_of.values())
+        comments = Counter(author_of[record['post']]
+                           for record in records
+                           if record['type'] == 'comment')
+        average = sum(comments.values()) / len(author_of)
+        busiest = max(comments[author] / posts[author] for author in posts)
+        self.assertGreater(busiest, 5 * average)
+
+    def test_generated_dataset(self):
+        """Проверка: команда создаёт набор со счётчиками и лентами,
+        подписчики распределены неравномерно."""
+        out = StringIO()
+        call_command(
+            'generate_fake_data', '--users', '100', '--posts', '500',
+            '--comments', '300', '--groups', '3', '--follows', '10',
+            '--password', 'pass12345', stdout=out
+        )
+        self.assertIn('постов: 500', out.getvalue())
+        self.assertEqual(User.objects.count(), 100)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 500)
+        self.assertEqual(Comment.objects.count(), 300)
+        self.assertTrue(Timeline.objects.exists())
+        followers = sorted(
+            Profile.objects.values_list('follower_count', flat=True),
+            reverse=True
+        )
+        self.assertEqual(sum(followers), Follow.objects.count())
+        self.assertGreater(followers[0], 3 * sum(followers) / len(followers))
+        self.assertTrue(
+            self.client.login(
+                username=User.objects.first().username, password='pass12345'
+            )
+        )
@@ -0,0 +1,167 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import (
+    TestCase, TransactionTestCase, Client, override_settings
+)
+from django.urls import reverse
+
+from posts import graph
+from posts.graph import FollowGraph
+from posts.models import Follow
+
+User = get_user_model()
+
+
+class FollowGraphTest(TestCase):
+    """Тест графа подписок в памяти"""
+
+    def setUp(self):
+        # 1 -> 2, 3; 2 -> 1, 3, 4; 3 -> 4, 5; 4 -> 1
+        self.graph = FollowGraph(sorted([
+            (1, 2), (1, 3), (2, 1), (2, 3), (2, 4), (3, 4), (3, 5), (4, 1),
+        ]))
+
+    def test_adjacency_is_sorted(self):
+        """Проверка: списки подписок и подписчиков отсортированы"""
+        self.assertEqual(list(self.graph.following_of(2)), [1, 3, 4])
+        self.assertEqual(list(self.graph.followers_of(1)), [2, 4])
+        self.assertEqual(list(self.graph.following_of(99)), [])
+
+    def test_is_following_and_mutuals(self):
+        """Проверка: подписка и взаимные подписки"""
+        self.assertTrue(self.graph.is_following(1, 3))
+        self.assertFalse(self.graph.is_following(3, 1))
+        self.assertEqual(self.graph.mutuals(1), [2])
+        self.assertEqual(self.graph.mutuals(5), [])
+
+    def test_recommendations_rank_friends_of_friends(self):
+        """Проверка: рекомендации - авторы друзей по числу общих
+        связей, без себя и уже подписанных"""
+        self.assertEqual(self.graph.recommendations(1), [4, 5])
+        self.assertEqual(self.graph.recommendations(1, limit=1), [4])
+        self.assertEqual(self.graph.recommendations(5), [])
+
+    def test_add_and_remove_keep_order(self):
+        """Проверка: add и remove сохраняют массивы отсортированными
+        и не создают дублей"""
+        self.graph.add(1, 0)
+        self.graph.add(1, 9)
+        self.graph.add(1, 3)
+        self.assertEqual(list(self.graph.following_of(1)), [0, 2, 3, 9])
+        self.assertEqual(list(self.graph.followers_of(0)), [1])
+        self.graph.remove(1, 3)
+        self.graph.remove(7, 8)
+        self.assertEqual(list(self.graph.following_of(1)), [0, 2, 9])
+        self.assertEqual(list(self.graph.followers_of(3)), [2])
+
+
+class FollowGraphServiceTest(TestCase):
+    """Тест графа подписок во вью"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.friend = User.objects.create_user(username='friend')
+        cls.author = User.objects.create_user(username='author')
+        Follow.objects.create(user=cls.reader, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        graph.reset()
+        self.addCleanup(graph.reset)
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_profile_reads_following_from_graph(self):
+        """Проверка: профиль берёт подписку из графа"""
+        graph.get_graph()
+        response = self.client.get(
+            reverse('posts:profile', args=[self.friend.username])
+        )
+        self.assertTrue(response.context['following'])
+        self.assertEqual(
+            response.context['profile'].follower_count, 1
+        )
+
+    def test_follow_index_recommends_friends_of_friends(self):
+        """Проверка: лента подписок предлагает авторов друзей"""
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['recommended'], [self.author])
+        self.assertContains(
+            response,
+            reverse('posts:profile_follow', args=[self.author.username])
+        )
+
+
+class FollowGraphCommitTest(TransactionTestCase):
+    """Тест обновления графа после фиксации транзакций и его фоновой
+    перезагрузки"""
+
+    def setUp(self):
+        graph.reset()
+        self.addCleanup(graph.reset)
+        self.reader = User.objects.create_user(username='reader')
+        self.friend = User.objects.create_user(username='friend')
+        self.author = User.objects.create_user(username='author')
+        Follow.objects.create(user=self.reader, author=self.friend)
+
+    def test_graph_follows_committed_signals(self):
+        """Проверка: граф видит зафиксированные подписки и отписки,
+        а откаченные пропускает"""
+        current = graph.get_graph()
+        self.assertTrue(current.is_following(self.reader.pk, self.friend.pk))
+        with transaction.atomic():
+            follow = Follow.objects.create(
+                user=self.reader, author=self.author
+            )
+            self.assertFalse(
+                current.is_following(self.reader.pk, self.author.pk)
+            )
+        self.assertTrue(current.is_following(self.reader.pk, self.author.pk))
+        follow.delete()
+        self.assertFalse(
+            current.is_following(self.reader.pk, self.author.pk)
+        )
+        with transaction.atomic():
+            Follow.objects.create(user=self.friend, author=self.author)
+            transaction.set_rollback(True)
+        self.assertFalse(
+            current.is_following(self.friend.pk, self.author.pk)
+        )
+        self.assertIs(graph.get_graph(), current)
+
+    @override_settings(FOLLOW_GRAPH_MAX_AGE=0)
+    def test_stale_graph_reloads_in_background(self):
+        """Проверка: устаревший граф отдаётся сразу, а новый
+        загружается из базы в фоне"""
+        current = graph.get_graph()
+        Follow.objects.filter(user=self.reader).update(author=self.author)
+        self.assertIs(graph.get_graph(), current)
+        # Фоновый поток держит блокировку, пока не подменит граф.
+        with graph._lock:
+            fresh = graph._graph
+        self.assertIsNot(fresh, current)
+        self.assertTrue(fresh.is_following(self.reader.pk, self.author.pk))
+
+    def test_reload_replays_changes_missed_by_snapshot(self):
+        """Проверка: подписка, зафиксированная после снимка базы,
+        не теряется при подмене графа"""
+        graph.get_graph()
+        load = FollowGraph.load
+
+        def snapshot_then_follow():
+            loaded = load()
+            Follow.objects.create(user=self.friend, author=self.author)
+            return loaded
+
+        graph._lock.acquire()
+        with mock.patch.object(FollowGraph, 'load', snapshot_then_follow):
+            graph._reload()
+        self.assertTrue(
+            graph.get_graph().is_following(self.friend.pk, self.author.pk)
+        )
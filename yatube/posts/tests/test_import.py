@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from posts.importer import Importer, ImportFailed
+from posts.models import Comment, Follow, Group, Post, Timeline
+from posts.search import SearchResults
+
+User = get_user_model()
+
+LINES = [
+    {'type': 'post', 'id': 501, 'author': 'legacy', 'group': 'old-slug',
+     'text': 'Перенесённый пост', 'pub_date': '2015-03-01T10:00:00+00:00'},
+    {'type': 'post', 'id': 502, 'author': 'auth', 'text': 'Второй пост',
+     'pub_date': '2015-03-02T10:00:00'},
+    {'type': 'comment', 'id': 701, 'post': 501, 'author': 'auth',
+     'text': 'Старый комментарий', 'created': '2015-03-03T10:00:00Z'},
+    {'type': 'follow', 'user': 'auth', 'author': 'legacy'},
+]
+
+
+class ImportTest(TestCase):
+    """Тесты массовой загрузки import_content"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def lines(self):
+        return [json.dumps(line, ensure_ascii=False) for line in LINES]
+
+    def test_rows_loaded_with_lookups_and_dates(self):
+        """Проверка: строки загружены, авторы и группы созданы,
+        даты из выгрузки сохранены."""
+        stats = Importer(batch_size=2).load(self.lines())
+        self.assertEqual(
+            (stats['post'], stats['comment'], stats['follow']), (2, 1, 1)
+        )
+        self.assertEqual((stats['users'], stats['groups']), (1, 1))
+        post = Post.objects.get(pk=501)
+        self.assertEqual(post.author.username, 'legacy')
+        self.assertEqual(post.group, Group.objects.get(slug='old-slug'))
+        self.assertEqual(post.pub_date.year, 2015)
+        self.assertEqual(post.updated, post.pub_date)
+        self.assertEqual(Comment.objects.get(pk=701).created.day, 3)
+        self.assertTrue(
+            Follow.objects.filter(user=self.user, author=post.author).exists()
+        )
+
+    def test_derived_data_rebuilt(self):
+        """Проверка: после загрузки пересчитаны счётчики, ленты,
+        полнотекстовый индекс и восстановлены индексы таблиц."""
+        Importer().load(self.lines())
+        legacy = User.objects.get(username='legacy')
+        self.assertEqual(legacy.profile.post_count, 1)
+        self.assertEqual(legacy.profile.follower_count, 1)
+        self.assertEqual(
+            User.objects.get(pk=self.user.pk).profile.following_count, 1
+        )
+        self.assertTrue(
+            Timeline.objects.filter(user=self.user, post_id=501).exists()
+        )
+        self.assertEqual(list(SearchResults('комментарий')[:10]),
+                         [Post.objects.get(pk=501)])
+        Post.objects.create(author=self.user, text='Новый пост')
+        self.assertEqual(len(SearchResults('новый')[:10]), 1)
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(
+                cursor, Post._meta.db_table
+            )
+        self.assertIn('post_author_pub_date_idx', indexes)
+
+    def test_errors(self):
+        """Проверка: битая строка или неизвестный тип прерывают
+        загрузку с номером строки."""
+        with self.assertRaisesMessage(ImportFailed, 'Строка 2'):
+            Importer().load(['', '{'])
+        with self.assertRaisesMessage(ImportFailed, 'неизвестный type'):
+            Importer().load(['{"type": "like"}'])
+
+    def test_failed_import_rebuilds_committed_batches(self):
+        """Проверка: если загрузка прервалась после записанной пачки,
+        счётчики и пути комментариев этой пачки всё равно построены."""
+        lines = [
+            LINES[0],
+            {'type': 'comment', 'id': 701, 'post': 501, 'author': 'auth',
+             'text': 'Корень'},
+            {'type': 'comment', 'id': 702, 'post': 501, 'author': 'auth',
+             'text': 'Ответ', 'parent': 701},
+        ]
+        with self.assertRaisesMessage(ImportFailed, 'Строка 4'):
+            Importer(batch_size=2).load(
+                [json.dumps(line) for line in lines] + ['{']
+            )
+        post = Post.objects.get(pk=501)
+        self.assertEqual(post.author.profile.post_count, 1)
+        self.assertEqual(post.comment_count, 2)
+        root, reply = Comment.objects.order_by('pk')
+        self.assertTrue(root.path)
+        self.assertTrue(reply.path.startswith(root.path))
+        self.assertEqual(reply.depth, 1)
+
+    def test_command_reports_rate(self):
+        """Проверка: команда читает файл и сообщает скорость."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'dump.ndjson')
+            with open(path, 'w', encoding='utf-8') as dump:
+                dump.write('\n'.join(self.lines()))
+            out = StringIO()
+            call_command('import_content', path, stdout=out)
+            # Повторная загрузка тех же id - ошибка, а не дубли.
+            with self.assertRaises(CommandError):
+                call_command('import_content', path, stdout=StringIO())
+        self.assertIn('строк/с', out.getvalue())
+        self.assertIn('Постов: 2', out.getvalue())
+        self.assertEqual(Post.objects.count(), 2)
@@ -2,6 +2,8 @@ from django.contrib.auth import get_user_model
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from posts.models import Post, Group
 
@@ -93,3 +95,63 @@ class PaginatorViewsTest(TestCase):
             Post.objects.all().count() - settings.PAGE_COUNTER_TEN
         )
         self.assertEqual(len(response.context['page_obj']), remaining_posts)
+
+
+class CursorPaginatorViewsTest(TestCase):
+    """Тест курсорной паджинации приложения posts"""
+    group_title = 'Тайтл'
+    group_slug = 'group_slug'
+    group_description = 'group_description'
+    username = 'auth'
+    counter_iter = 13
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=cls.username)
+        cls.group = Group.objects.create(
+            title=cls.group_title,
+            slug=cls.group_slug,
+            description=cls.group_description
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=i, group=cls.group)
+            for i in range(cls.counter_iter)
+        )
+
+    def test_cursor_pages_walk_forward_and_back(self):
+        """Проверка: курсоры next/previous обходят ленту без пропусков"""
+        url = reverse('posts:group_list', kwargs={'slug': self.group_slug})
+        first = self.client.get(url + '?cursor=').context['page_obj']
+        self.assertEqual(len(first), settings.PAGE_COUNTER_TEN)
+        self.assertFalse(first.has_previous())
+        second = self.client.get(
+            url + f'?cursor={first.next_cursor}'
+        ).context['page_obj']
+        self.assertEqual(
+            len(second), self.counter_iter - settings.PAGE_COUNTER_TEN
+        )
+        self.assertFalse(second.has_next())
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        self.assertEqual(list(first) + list(second), expected)
+        back = self.client.get(
+            url + f'?cursor={second.previous_cursor}'
+        ).context['page_obj']
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+
+    def test_cursor_mode_does_not_count(self):
+        """Проверка: курсорная страница не выполняет COUNT(*)"""
+        url = reverse('posts:index') + '?cursor='
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'])
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        """Проверка: битый курсор отдаёт первую страницу"""
+        response = self.client.get(reverse('posts:index') + '?cursor=%%%')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            len(response.context['page_obj']), settings.PAGE_COUNTER_TEN
+        )
@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import graph
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# Бюджет SQL-запросов на одну страницу для авторизованного
+# пользователя. Не зависит от числа постов на странице: N+1 в шаблоне
+# сразу выходит за пределы бюджета. Группа, профиль и пост тратят ещё
+# один запрос на ETag (posts.etags), зато повторный запрос без
+# изменений обходится только им.
+QUERY_BUDGETS = {
+    'posts:index': 4,
+    'posts:group_list': 6,
+    'posts:profile': 7,
+    'posts:post_detail': 5,
+    'posts:comments': 5,
+    'posts:follow_index': 5,
+}
+
+
+class QueryBudgetTest(TestCase):
+    """Тест бюджета запросов страниц с лентами постов"""
+    posts_per_author = 6
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authorized = Client()
+        cls.authorized.force_login(cls.reader)
+        cls.group = Group.objects.create(
+            title='Тайтл', slug='group_slug', description='description'
+        )
+        cls.authors = [
+            User.objects.create_user(username=f'author_{i}')
+            for i in range(3)
+        ]
+        for author in cls.authors:
+            Follow.objects.create(user=cls.reader, author=author)
+            for i in range(cls.posts_per_author):
+                Post.objects.create(author=author, text=i, group=cls.group)
+        cls.post = Post.objects.filter(author=cls.authors[0]).first()
+        for author in cls.authors:
+            Comment.objects.create(post=cls.post, author=author, text='c')
+
+    def setUp(self):
+        cache.clear()
+        # Граф подписок загружается один раз на процесс, а бюджет
+        # считается для обычного запроса к уже работающему серверу.
+        graph.reset()
+        graph.get_graph()
+
+    def get_urls(self):
+        return {
+            'posts:index': reverse('posts:index'),
+            'posts:group_list': reverse(
+                'posts:group_list', args=[self.group.slug]
+            ),
+            'posts:profile': reverse(
+                'posts:profile', args=[self.authors[0].username]
+            ),
+            'posts:post_detail': reverse(
+                'posts:post_detail', args=[self.post.id]
+            ),
+            'posts:comments': reverse('posts:comments', args=[self.post.id]),
+            'posts:follow_index': reverse('posts:follow_index'),
+        }
+
+    def test_views_fit_query_budget(self):
+        """Проверка: страницы укладываются в бюджет запросов"""
+        for name, url in self.get_urls().items():
+            with self.subTest(view=name):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.authorized.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(
+                    len(queries), QUERY_BUDGETS[name],
+                    '\n'.join(query['sql'] for query in queries)
+                )
@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from posts import threads
+from posts.models import Comment, Follow, Group, Post, Timeline
+from posts.timeline import follow_feed
+
+User = get_user_model()
+
+
+class QueryPlanTest(TestCase):
+    """Тест планов запросов лент: EXPLAIN QUERY PLAN SQLite
+    должен использовать индекс и не сортировать во временном B-дереве.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тайтл', slug='group_slug', description='description'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='text', group=cls.group
+        )
+        cls.comment = Comment.objects.create(
+            post=cls.post, author=cls.user, text='comment'
+        )
+        # Читатель с неразосланным постом среди подписок: его лента
+        # идёт по второй ветке follow_feed.
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        Post.objects.filter(pk=cls.post.pk).update(fanned_out=False)
+
+    def get_querysets(self):
+        return {
+            'index': Post.objects.all(),
+            'group_posts': self.group.groups.all(),
+            'profile': self.user.posts.all(),
+            'profile_cursor': self.user.posts.filter(
+                pub_date__lt=self.post.pub_date
+            ).order_by('-pub_date', '-pk'),
+            'comments': threads.window(self.post.comments.all())[0],
+            'comment_replies': threads.window(
+                self.post.comments.all(), self.comment.path, self.comment
+            )[0],
+            'followers': Follow.objects.filter(author=self.user),
+            'timeline': Timeline.objects.filter(user=self.user),
+            'follow_index': follow_feed(self.user),
+            'follow_index_cursor': follow_feed(self.user).filter(
+                feed_date__lt=self.post.pub_date
+            ),
+            'unfanned_posts': Post.objects.filter(
+                fanned_out=False, author=self.user
+            ),
+        }
+
+    def test_feed_queries_use_indexes(self):
+        """Проверка: запросы лент идут по индексам без сортировки"""
+        for name, queryset in self.get_querysets().items():
+            with self.subTest(query=name):
+                plan = queryset[:10].explain()
+                self.assertNotIn('TEMP B-TREE', plan)
+                self.assertRegex(plan, r'USING (COVERING )?INDEX')
+
+    def test_unfanned_feed_reads_both_sources_by_index(self):
+        """Проверка: лента с неразосланными постами берёт и Timeline,
+        и посты авторов по индексам, без полного просмотра постов.
+        Объединение двух источников сортируется, но это только
+        посты ленты читателя, а не вся таблица."""
+        plan = follow_feed(self.reader)[:10].explain()
+        self.assertIn('MULTI-INDEX OR', plan)
+        self.assertIn('post_unfanned_author_idx', plan)
+        self.assertIn('sqlite_autoindex_posts_timeline_1', plan)
+        self.assertNotRegex(plan, r'SCAN (TABLE )?posts_post\b')
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.conf import settings
+
+from posts.models import Comment, Post
+from posts.search import SearchResults
+
+User = get_user_model()
+
+
+class SearchTest(TestCase):
+    """Тест полнотекстового поиска FTS5"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            author=cls.user, text='Пингвины живут в Антарктиде'
+        )
+        cls.commented = Post.objects.create(author=cls.user, text='Фото')
+        Comment.objects.create(
+            post=cls.commented, author=cls.user, text='Какие пингвины!'
+        )
+
+    def search(self, query):
+        return list(SearchResults(query)[:settings.PAGE_COUNTER_TEN])
+
+    def test_posts_found_by_text_and_comments(self):
+        """Проверка: пост находится по тексту и по комментариям,
+        совпадение в тексте поста выше."""
+        self.assertEqual(self.search('пингвины'), [self.post, self.commented])
+
+    def test_prefix_and_special_characters(self):
+        """Проверка: последнее слово ищется по префиксу,
+        операторы FTS5 в запросе не ломают поиск."""
+        self.assertEqual(self.search('антаркт'), [self.post])
+        self.assertEqual(self.search('"AND (* NEAR'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Проверка: индекс обновляется при изменении и удалении"""
+        Post.objects.filter(pk=self.post.pk).update(text='Тюлени')
+        self.assertEqual(self.search('тюлени'), [self.post])
+        self.assertEqual(self.search('антарктиде'), [])
+        Post.objects.get(pk=self.post.pk).delete()
+        self.assertEqual(self.search('тюлени'), [])
+
+    def test_search_view_paginates(self):
+        """Проверка: страница поиска паджинирует результаты"""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пингвин {i}')
+            for i in range(settings.PAGE_COUNTER_TEN)
+        )
+        response = self.client.get(reverse('posts:search'), {'q': 'пингвин'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), settings.PAGE_COUNTER_TEN)
+        self.assertEqual(page_obj.paginator.count, 12)
+        self.assertContains(response, '?q=%D0%BF%D0%B8%D0%BD')
+
+    def test_admin_search_uses_index(self):
+        """Проверка: поиск в админке идёт по индексу FTS5"""
+        admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'антарктиде'}
+        )
+        self.assertEqual(list(response.context['cl'].result_list), [self.post])
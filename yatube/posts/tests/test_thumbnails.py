@@ -0,0 +1,115 @@
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+from posts.models import Post, ThumbnailJob
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailQueueTest(TestCase):
+    """Тест очереди предварительной генерации миниатюр"""
+    small_gif = (
+        b'\x47\x49\x46\x38\x39\x61\x02\x00'
+        b'\x01\x00\x80\x00\x00\x00\x00\x00'
+        b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+        b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+        b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+        b'\x0A\x00\x3B'
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create_post(self, **kwargs):
+        return Post.objects.create(author=self.user, text='text', **kwargs)
+
+    def test_post_with_image_is_enqueued_once(self):
+        """Проверка: пост с картинкой ставится в очередь один раз"""
+        post = self.create_post(image=SimpleUploadedFile(
+            'small.gif', self.small_gif, content_type='image/gif'
+        ))
+        post.save()
+        self.create_post()
+        self.assertEqual(ThumbnailJob.objects.count(), 1)
+        self.assertEqual(ThumbnailJob.objects.get().post, post)
+
+    def test_worker_builds_thumbnails(self):
+        """Проверка: process_thumbnails строит миниатюры и
+        очищает очередь."""
+        post = self.create_post(image=SimpleUploadedFile(
+            'small.gif', self.small_gif, content_type='image/gif'
+        ))
+        index = reverse('posts:index')
+        self.client.get(index)
+        call_command('process_thumbnails', once=True, stdout=StringIO())
+        self.assertFalse(ThumbnailJob.objects.exists())
+        source = ImageFile(post.image)
+        self.assertTrue(default.kvstore.get(source))
+        self.assertContains(self.client.get(index), 'srcset')
+
+    def test_failed_job_is_retried_and_kept(self):
+        """Проверка: задание с ошибкой остаётся в очереди"""
+        post = self.create_post(image='posts/broken.gif')
+        with mock.patch(
+            'posts.thumbnails.get_thumbnail', side_effect=OSError('broken')
+        ):
+            call_command(
+                'process_thumbnails', once=True, stdout=StringIO()
+            )
+        job = ThumbnailJob.objects.get(post=post)
+        self.assertEqual(job.attempts, settings.THUMBNAIL_JOB_MAX_ATTEMPTS)
+        self.assertTrue(job.error)
+
+    def test_exhausted_job_is_reset_on_save(self):
+        """Проверка: новое сохранение поста с картинкой снова ставит
+        в очередь задание, исчерпавшее попытки"""
+        post = self.create_post(image='posts/broken.gif')
+        ThumbnailJob.objects.filter(post=post).update(
+            attempts=settings.THUMBNAIL_JOB_MAX_ATTEMPTS,
+            started=timezone.now(), error='broken'
+        )
+        post.image = SimpleUploadedFile(
+            'small.gif', self.small_gif, content_type='image/gif'
+        )
+        post.save()
+        job = ThumbnailJob.objects.get(post=post)
+        self.assertEqual((job.attempts, job.started, job.error), (0, None, ''))
+        call_command('process_thumbnails', once=True, stdout=StringIO())
+        self.assertFalse(ThumbnailJob.objects.exists())
+
+    def test_page_does_not_render_unprocessed_thumbnails(self):
+        """Проверка: страница поста с необработанным заданием выводит
+        исходную картинку и не нарезает миниатюры"""
+        post = self.create_post(image=SimpleUploadedFile(
+            'small.gif', self.small_gif, content_type='image/gif'
+        ))
+        with mock.patch('sorl.thumbnail.default.engine.get_image') as decode:
+            response = self.client.get(
+                reverse('posts:post_detail', args=[post.pk])
+            )
+        decode.assert_not_called()
+        self.assertContains(response, f'src="{post.image.url}"')
+        self.assertNotContains(response, 'srcset')
+        self.assertTrue(ThumbnailJob.objects.filter(post=post).exists())
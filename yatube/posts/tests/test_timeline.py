@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Post, Timeline
+from posts.timeline import fan_out_post
+
+User = get_user_model()
+
+
+class TimelineTest(TestCase):
+    """Тест материализованной ленты подписок"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.authorized = Client()
+        cls.authorized.force_login(cls.reader)
+
+    def follow_page(self):
+        response = self.authorized.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        """Проверка: новый пост попадает в ленты подписчиков"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='fan-out')
+        self.assertTrue(
+            Timeline.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(self.follow_page(), [post])
+
+    def test_follow_backfills_and_unfollow_trims(self):
+        """Проверка: подписка заполняет ленту, отписка очищает"""
+        post = Post.objects.create(author=self.author, text='backfill')
+        self.authorized.get(
+            reverse('posts:profile_follow', args=[self.author.username])
+        )
+        self.assertEqual(self.follow_page(), [post])
+        self.authorized.get(
+            reverse('posts:profile_unfollow', args=[self.author.username])
+        )
+        self.assertFalse(Timeline.objects.filter(user=self.reader).exists())
+        self.assertEqual(self.follow_page(), [])
+
+    def test_deleted_post_leaves_timeline(self):
+        """Проверка: удалённый пост пропадает из ленты"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='deleted')
+        post.delete()
+        self.assertFalse(Timeline.objects.filter(user=self.reader).exists())
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_is_read_on_the_fly(self):
+        """Проверка: посты популярного автора не рассылаются,
+        но видны в ленте подписчика."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='celebrity')
+        post.refresh_from_db()
+        self.assertFalse(post.fanned_out)
+        self.assertFalse(Timeline.objects.filter(post=post).exists())
+        self.assertEqual(self.follow_page(), [post])
+
+    def test_follow_index_cursor_pages(self):
+        """Проверка: курсорная паджинация ленты подписок"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.bulk_create(
+            Post(author=self.author, text=i)
+            for i in range(settings.PAGE_COUNTER_TEN + 2)
+        )
+        for post in Post.objects.all():
+            fan_out_post(post)
+        url = reverse('posts:follow_index')
+        first = self.authorized.get(url + '?cursor=').context['page_obj']
+        second = self.authorized.get(
+            url + f'?cursor={first.next_cursor}'
+        ).context['page_obj']
+        self.assertEqual(
+            list(first) + list(second),
+            list(Post.objects.order_by('-pub_date', '-pk'))
+        )
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import trending
+from posts.models import Comment, Engagement, Follow, Post, TrendingScore
+
+User = get_user_model()
+
+
+@override_settings(
+    TRENDING_HALF_LIFE_HOURS=1,
+    TRENDING_WEIGHTS={'comment': 1.0, 'follow': 3.0},
+    TRENDING_MIN_SCORE=0.1,
+)
+class TrendingTest(TestCase):
+    """Тест рейтинга популярных постов"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.quiet = Post.objects.create(author=cls.author, text='Тихий')
+        cls.hot = Post.objects.create(author=cls.author, text='Горячий')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.now = timezone.now()
+
+    def comment(self, post):
+        return Comment.objects.create(
+            post=post, author=self.reader, text='Комментарий'
+        )
+
+    def score(self, post):
+        return TrendingScore.objects.get(post=post).score
+
+    def test_decay_halves_per_half_life(self):
+        """Проверка: вклад события вдвое меньше за каждый период
+        полураспада"""
+        self.assertEqual(trending.decay(0), 1)
+        self.assertAlmostEqual(trending.decay(3600), 0.5)
+        self.assertAlmostEqual(trending.decay(2 * 3600), 0.25)
+        self.assertEqual(trending.decay(-60), 1)
+
+    def test_comment_events_fold_into_scores(self):
+        """Проверка: комментарии пишут события, update сворачивает их
+        в рейтинг и удаляет"""
+        self.comment(self.hot)
+        self.comment(self.hot)
+        self.comment(self.quiet)
+        self.assertEqual(Engagement.objects.count(), 3)
+        self.assertEqual(trending.update(self.now), (3, 2))
+        self.assertFalse(Engagement.objects.exists())
+        self.assertAlmostEqual(self.score(self.hot), 2, places=3)
+        self.assertAlmostEqual(self.score(self.quiet), 1, places=3)
+
+    def test_update_decays_previous_scores(self):
+        """Проверка: следующий update умножает прежний рейтинг
+        на множитель затухания и добавляет новые события"""
+        self.comment(self.hot)
+        trending.update(self.now)
+        self.comment(self.quiet)
+        Engagement.objects.update(created=self.now + timedelta(hours=1))
+        trending.update(self.now + timedelta(hours=1))
+        self.assertAlmostEqual(self.score(self.hot), 0.5, places=3)
+        self.assertAlmostEqual(self.score(self.quiet), 1, places=3)
+        self.assertEqual(
+            set(TrendingScore.objects.values_list('computed', flat=True)),
+            {self.now + timedelta(hours=1)}
+        )
+
+    def test_faded_posts_are_pruned(self):
+        """Проверка: посты ниже TRENDING_MIN_SCORE выпадают из рейтинга"""
+        self.comment(self.hot)
+        trending.update(self.now)
+        self.assertEqual(trending.update(self.now + timedelta(hours=4)),
+                         (0, 0))
+        self.assertFalse(TrendingScore.objects.exists())
+
+    def test_follow_boosts_latest_post(self):
+        """Проверка: подписка на автора поднимает его последний пост
+        с весом подписки"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        trending.update(self.now)
+        self.assertAlmostEqual(self.score(self.hot), 3, places=3)
+        self.assertFalse(TrendingScore.objects.filter(post=self.quiet))
+
+    def test_rebuild_uses_recent_comments(self):
+        """Проверка: rebuild строит рейтинг заново по комментариям
+        из окна TRENDING_WINDOW_HOURS и не учитывает их события
+        второй раз, а события подписок сохраняет"""
+        self.comment(self.quiet)
+        old = self.comment(self.hot)
+        Comment.objects.filter(pk=old.pk).update(
+            created=self.now - timedelta(days=30)
+        )
+        TrendingScore.objects.create(post=self.hot, score=50,
+                                     computed=self.now)
+        trending.rebuild(self.now)
+        self.assertAlmostEqual(self.score(self.quiet), 1, places=2)
+        self.assertFalse(TrendingScore.objects.filter(post=self.hot))
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.comment(self.quiet)
+        trending.rebuild(self.now)
+        self.assertAlmostEqual(self.score(self.quiet), 2, places=2)
+        self.assertAlmostEqual(self.score(self.hot), 3, places=2)
+
+    def test_trending_page_orders_by_score(self):
+        """Проверка: страница популярного идёт по убыванию рейтинга,
+        а update_trending сбрасывает её кэш"""
+        self.comment(self.quiet)
+        out = StringIO()
+        call_command('update_trending', stdout=out)
+        self.assertIn('Событий: 1', out.getvalue())
+        url = reverse('posts:trending')
+        response = self.client.get(url)
+        self.assertEqual(list(response.context['page_obj']), [self.quiet])
+        self.comment(self.hot)
+        self.comment(self.hot)
+        call_command('update_trending', stdout=StringIO())
+        response = self.client.get(url)
+        self.assertTemplateUsed(response, 'posts/index.html')
+        self.assertTrue(response.context['trending'])
+        self.assertEqual(
+            list(response.context['page_obj']), [self.hot, self.quiet]
+        )
@@ -9,7 +9,9 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.conf import settings
 from django.core.cache import cache
 
+from core.cache import get_generation
 from posts.models import Post, Group
+from posts.utils import FEED_GENERATION, post_card_key
 
 User = get_user_model()
 
@@ -246,12 +248,63 @@ class PostViewTest(TestCase):
 
     def test_cache_index_page(self):
         """Проверка кеширования главной страницы."""
-        response_first = self.client.get(reverse('posts:index'))
         post = Post.objects.get(id=self.post_any_text.id)
-        Post.objects.filter(id=self.post_any_text.id).delete()
+        response_first = self.authorized.get(reverse('posts:index'))
+        Post.objects.filter(id=post.id).update(text='changed quietly')
         response_second = self.authorized.get(reverse('posts:index'))
         self.assertIn(post.text, response_first.content.decode('utf-8'))
         self.assertIn(post.text, response_second.content.decode('utf-8'))
         cache.clear()
         clear_response = self.authorized.get(reverse('posts:index'))
         self.assertNotIn(post.text, clear_response.content.decode('utf-8'))
+
+    def test_cache_index_page_invalidated_by_posts(self):
+        """Проверка: новый и удалённый пост сразу видны на главной."""
+        self.authorized.get(reverse('posts:index'))
+        new_post = Post.objects.create(author=self.user, text='fresh_post')
+        response = self.authorized.get(reverse('posts:index'))
+        self.assertIn(new_post.text, response.content.decode('utf-8'))
+        new_post.delete()
+        response = self.authorized.get(reverse('posts:index'))
+        self.assertNotIn(new_post.text, response.content.decode('utf-8'))
+
+    def test_post_card_fragment_is_cached_per_version(self):
+        """Проверка: карточка поста кешируется и обновляется
+        после редактирования."""
+        post = Post.objects.create(author=self.user, text='card_text')
+        key = post_card_key(post)
+        self.authorized.get(
+            reverse('posts:profile', kwargs={'username': self.username})
+        )
+        self.assertIn('card_text', cache.get(key))
+        self.authorized.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.id}),
+            data={'text': 'edited_card_text'}
+        )
+        self.assertIsNone(cache.get(key))
+        response = self.authorized.get(reverse('posts:index'))
+        self.assertIn('edited_card_text', response.content.decode('utf-8'))
+
+    def test_post_card_fragment_follows_author_name(self):
+        """Проверка: после смены имени автора закешированные главная
+        и карточка показывают новое имя."""
+        author = User.objects.get(pk=self.user.pk)
+        Post.objects.create(author=author, text='named_card')
+        author.first_name = 'Старое'
+        author.save()
+        self.authorized.get(reverse('posts:index'))
+        author.first_name = 'Новое'
+        author.save()
+        content = self.authorized.get(
+            reverse('posts:index')
+        ).content.decode('utf-8')
+        self.assertIn('Новое', content)
+        self.assertNotIn('Старое', content)
+
+    def test_login_does_not_invalidate_feeds(self):
+        """Проверка: сохранение без полей имени не сбрасывает кеш лент."""
+        generation = get_generation(FEED_GENERATION)
+        author = User.objects.get(pk=self.user.pk)
+        author.save(update_fields=['last_login'])
+        author.save()
+        self.assertEqual(get_generation(FEED_GENERATION), generation)
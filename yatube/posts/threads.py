@@ -0,0 +1,141 @@
+"""Ветки комментариев на материализованном пути.
+Comment.path - id всех предков и самого комментария, каждый дополнен
+нулями до SEGMENT символов. Сортировка по path даёт обход дерева
+в глубину: ответ идёт сразу за родителем, ответы одного родителя -
+в порядке создания. Поддерево комментария - это диапазон
+[path, path + END) по индексу (post, path), поэтому и вся ветка,
+и её часть после курсора читаются одним упорядоченным запросом
+без рекурсии по уровням.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Comment
+from .utils import CursorPage
+
+SEGMENT = 10
+# Следующий за '9' символ: верхняя граница путей поддерева.
+END = ':'
+
+
+def segment(pk):
+    return str(pk).zfill(SEGMENT)
+
+
+def subtree(queryset, comment):
+    """Потомки comment в queryset, без него самого."""
+    return queryset.filter(
+        path__gt=comment.path, path__lt=comment.path + END
+    )
+
+
+def assign_path(comment):
+    """Записывает path и depth только что созданного комментария.
+    id известен лишь после INSERT, поэтому путь пишется отдельным
+    UPDATE; add_comment делает оба в одной транзакции.
+    """
+    prefix = comment.parent.path if comment.parent_id else ''
+    comment.path = prefix + segment(comment.pk)
+    comment.depth = len(prefix) // SEGMENT
+    Comment.objects.filter(pk=comment.pk).update(
+        path=comment.path, depth=comment.depth
+    )
+
+
+def reply_target(post, parent_id):
+    """Комментарий post, под которым встанет ответ на parent_id.
+    Ответы глубже COMMENT_MAX_DEPTH уровней становятся ответами
+    предка на последнем допустимом уровне. Для пустого или чужого
+    parent_id возвращает None: комментарий будет корневым.
+    """
+    if not str(parent_id or '').isdigit():
+        return None
+    parent = post.comments.filter(pk=parent_id).first()
+    limit = settings.COMMENT_MAX_DEPTH - 1
+    if parent is None or parent.depth < limit:
+        return parent
+    ancestor = parent.path[(limit - 1) * SEGMENT:limit * SEGMENT]
+    return post.comments.get(pk=int(ancestor))
+
+
+def _valid_cursor(cursor):
+    return (
+        cursor and cursor.isdigit() and len(cursor) % SEGMENT == 0
+    )
+
+
+def window(queryset, cursor=None, root=None):
+    """Упорядоченный queryset комментариев страницы после пути cursor
+    и глубина её последнего видимого уровня. root ограничивает выборку
+    поддеревом комментария; видны COMMENT_PAGE_DEPTH уровней от корня
+    выборки.
+    """
+    depth = settings.COMMENT_PAGE_DEPTH - 1
+    if root is not None:
+        queryset = subtree(queryset, root)
+        depth += root.depth + 1
+    if _valid_cursor(cursor):
+        queryset = queryset.filter(path__gt=cursor)
+    replies = Comment.objects.filter(parent=OuterRef('pk'))
+    return (
+        queryset.filter(depth__lte=depth)
+        .annotate(has_replies=Exists(replies))
+        .select_related('author')
+        .order_by('path')
+    ), depth
+
+
+def page(queryset, cursor=None, root=None):
+    """Следующие COMMENTS_PER_PAGE комментариев в порядке веток, см.
+    window(). У комментариев на последнем видимом уровне
+    has_hidden_replies говорит, нужна ли ссылка «Показать ответы».
+    """
+    queryset, depth = window(queryset, cursor, root)
+    per_page = settings.COMMENTS_PER_PAGE
+    rows = list(queryset[:per_page + 1])
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    for comment in rows:
+        comment.has_hidden_replies = (
+            comment.has_replies and comment.depth == depth
+        )
+    return CursorPage(
+        rows, None, rows[-1].path if has_next else None, None
+    )
+
+
+def fill_paths(batch_size=1000):
+    """Заполняет path и depth комментариев, созданных bulk_create.
+    Каждый проход по id обрабатывает комментарии, у родителя которых
+    путь уже есть, поэтому проходов не больше, чем уровней.
+    Возвращает число обновлённых комментариев.
+    """
+    total = 0
+    while True:
+        pending = Comment.objects.filter(path='').filter(
+            Q(parent=None) | ~Q(parent__path='')
+        ).order_by('pk')
+        updated, last = 0, 0
+        while True:
+            rows = list(
+                pending.filter(pk__gt=last)
+                .values_list('pk', 'parent__path')[:batch_size]
+            )
+            if not rows:
+                break
+            comments = []
+            for pk, prefix in rows:
+                prefix = prefix or ''
+                comments.append(Comment(
+                    pk=pk,
+                    path=prefix + segment(pk),
+                    depth=len(prefix) // SEGMENT
+                ))
+            with transaction.atomic():
+                Comment.objects.bulk_update(comments, ['path', 'depth'])
+            updated += len(comments)
+            last = rows[-1][0]
+        if not updated:
+            return total
+        total += updated
@@ -0,0 +1,91 @@
+"""Фоновая генерация миниатюр картинок постов.
+Тег {% responsive_image %} только читает готовые миниатюры из
+key-value store sorl-thumbnail, а пока их нет, выводит исходную
+картинку. Все варианты из core.images строятся здесь, поэтому запрос
+никогда не декодирует картинку.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from sorl.thumbnail import get_thumbnail
+
+from core.cache import bump_generation
+from core.images import variants
+
+from .models import ThumbnailJob
+from .utils import FEED_GENERATION, forget_post_card
+
+
+def enqueue(post):
+    """Ставит пост в очередь. Задание, которое уже есть, в том числе
+    исчерпавшее попытки, начинается заново: картинка могла смениться.
+    """
+    reset = ThumbnailJob.objects.filter(post=post).update(
+        started=None, attempts=0, error=''
+    )
+    if not reset:
+        ThumbnailJob.objects.bulk_create(
+            [ThumbnailJob(post=post)], ignore_conflicts=True
+        )
+
+
+def render(post):
+    """Строит все настроенные миниатюры картинки поста."""
+    for *_, geometry, options in variants():
+        get_thumbnail(post.image, geometry, **options)
+
+
+def claim():
+    """Захватывает следующее задание или возвращает None.
+    Захват - условный UPDATE, поэтому воркеров может быть несколько.
+    Задания, захваченные дольше THUMBNAIL_JOB_LEASE секунд назад,
+    считаются брошенными и захватываются заново.
+    """
+    now = timezone.now()
+    expired = now - timedelta(seconds=settings.THUMBNAIL_JOB_LEASE)
+    available = ThumbnailJob.objects.filter(
+        Q(started=None) | Q(started__lt=expired),
+        attempts__lt=settings.THUMBNAIL_JOB_MAX_ATTEMPTS
+    )
+    for job in available.select_related('post__author')[:10]:
+        claimed = available.filter(pk=job.pk).update(started=now)
+        if claimed:
+            return job
+    return None
+
+
+def process(job):
+    """Выполняет задание; при успехе удаляет его из очереди
+    и сбрасывает карточку поста и ленты, закешированные с исходной
+    картинкой.
+    """
+    try:
+        if job.post.image:
+            render(job.post)
+            forget_post_card(job.post)
+            bump_generation(FEED_GENERATION)
+    except Exception as error:
+        ThumbnailJob.objects.filter(pk=job.pk).update(
+            started=None, attempts=job.attempts + 1, error=repr(error)
+        )
+        return False
+    job.delete()
+    return True
+
+
+def drain(limit=None):
+    """Выполняет задания, пока очередь не опустеет или не будет
+    выполнено limit заданий. Возвращает (успешно, с ошибкой).
+    """
+    done = failed = 0
+    while limit is None or done + failed < limit:
+        job = claim()
+        if job is None:
+            break
+        if process(job):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
@@ -0,0 +1,115 @@
+"""Материализованная лента подписок для follow_index.
+Посты рассылаются в ленты подписчиков при публикации (fan-out on write).
+Посты авторов, у которых подписчиков больше TIMELINE_FANOUT_LIMIT,
+не рассылаются и читаются из Post напрямую (fan-out on read).
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+
+from .models import Follow, Post, Timeline
+
+# Поля ключа курсорной паджинации ленты, см. posts.utils.CursorPaginator.
+FEED_KEYS = ('feed_date', 'feed_post')
+
+
+def fan_out_post(post):
+    """Рассылает новый пост в ленты подписчиков автора."""
+    limit = settings.TIMELINE_FANOUT_LIMIT
+    followers = list(
+        Follow.objects.filter(author_id=post.author_id)
+        .values_list('user_id', flat=True)[:limit + 1]
+    )
+    if len(followers) > limit:
+        Post.objects.filter(pk=post.pk).update(fanned_out=False)
+        post.fanned_out = False
+        return
+    Timeline.objects.bulk_create(
+        [Timeline(user_id=user_id, post_id=post.pk, pub_date=post.pub_date)
+         for user_id in followers],
+        batch_size=settings.TIMELINE_BATCH_SIZE
+    )
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту нового подписчика уже разосланные посты автора.
+    Посты читаются пачками по pk, чтобы не держать их все в памяти.
+    """
+    batch_size = settings.TIMELINE_BATCH_SIZE
+    posts = Post.objects.filter(
+        author_id=author_id, fanned_out=True
+    ).order_by('pk').values_list('pk', 'pub_date')
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return
+        Timeline.objects.bulk_create(
+            [Timeline(user_id=user_id, post_id=pk, pub_date=pub_date)
+             for pk, pub_date in batch],
+            ignore_conflicts=True
+        )
+        last_pk = batch[-1][0]
+
+
+def trim(user_id, author_id):
+    """Убирает посты автора из ленты отписавшегося пользователя."""
+    Timeline.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+def follow_feed(user):
+    """Queryset постов для follow_index, упорядоченный по FEED_KEYS.
+    Если среди авторов пользователя нет неразосланных постов, лента
+    читается только из Timeline по индексу (user, pub_date, post).
+    Иначе разосланные посты берутся из ленты, а неразосланные -
+    напрямую у авторов, на которых он подписан.
+    """
+    followees = Follow.objects.filter(user=user).values('author')
+    unfanned = Post.objects.filter(fanned_out=False, author__in=followees)
+    if not unfanned.exists():
+        feed = Post.objects.filter(timeline_entries__user=user).annotate(
+            feed_date=F('timeline_entries__pub_date'),
+            feed_post=F('timeline_entries__post'),
+        )
+    else:
+        feed = Post.objects.filter(
+            Q(pk__in=Timeline.objects.filter(user=user).values('post'))
+            | Q(fanned_out=False, author__in=followees)
+        ).annotate(feed_date=F('pub_date'), feed_post=F('pk'))
+    return feed.order_by('-feed_date', '-feed_post')
+
+
+# Рассылка всех разосланных постов автора всем его подписчикам
+# одним запросом, без создания объектов Timeline в Python.
+REFRESH_SQL = '''
+    INSERT INTO {timeline} (user_id, post_id, pub_date)
+    SELECT follow.user_id, post.id, post.pub_date
+    FROM {follow} AS follow
+    JOIN {post} AS post ON post.author_id = follow.author_id
+    WHERE follow.author_id = %s AND post.fanned_out
+    ON CONFLICT DO NOTHING
+'''.format(
+    timeline=Timeline._meta.db_table,
+    follow=Follow._meta.db_table,
+    post=Post._meta.db_table,
+)
+
+
+def refresh_authors(author_ids):
+    """Досылает посты авторов author_ids во все ленты их подписчиков.
+    Нужна после массовой загрузки, которая не вызывает сигналы.
+    Посты авторов с числом подписчиков больше TIMELINE_FANOUT_LIMIT
+    помечаются неразосланными.
+    """
+    limit = settings.TIMELINE_FANOUT_LIMIT
+    with transaction.atomic(), connection.cursor() as cursor:
+        for author_id in author_ids:
+            followers = Follow.objects.filter(author_id=author_id)
+            if followers[limit:limit + 1].exists():
+                Post.objects.filter(
+                    author_id=author_id, fanned_out=True
+                ).update(fanned_out=False)
+                continue
+            cursor.execute(REFRESH_SQL, [author_id])
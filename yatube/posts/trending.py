@@ -0,0 +1,128 @@
+"""Рейтинг популярных постов с экспоненциальным затуханием.
+Событие весом w в момент t к моменту now даёт вклад
+w * 0.5 ** ((now - t) / half_life). Сумма вкладов затухает целиком
+с одним множителем, поэтому update() не пересчитывает историю: он
+умножает все рейтинги на множитель за время с прошлого запуска,
+добавляет вклады новых событий Engagement и удаляет их. У всех строк
+TrendingScore после этого один и тот же computed, и страница
+популярного просто читает их по индексу score.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from core.cache import bump_generation
+from .models import Comment, Engagement, Post, TrendingScore
+
+TRENDING_GENERATION = 'posts:trending'
+BATCH_SIZE = 500
+
+
+def record(post_id, kind):
+    """Записывает событие kind (ключ TRENDING_WEIGHTS) для поста."""
+    Engagement.objects.create(
+        post_id=post_id, kind=kind, weight=settings.TRENDING_WEIGHTS[kind]
+    )
+
+
+def record_follow(author_id):
+    """Подписка на автора поднимает его последний пост."""
+    post_id = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date'
+    ).values_list('pk', flat=True).first()
+    if post_id is not None:
+        record(post_id, 'follow')
+
+
+def decay(seconds):
+    """Множитель затухания за seconds секунд."""
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    return 0.5 ** (max(seconds, 0) / half_life)
+
+
+def _gains(events, now):
+    """Сумма затухших к now вкладов событий (post_id, weight, created)
+    по постам."""
+    gains = defaultdict(float)
+    for post_id, weight, created in events:
+        gains[post_id] += weight * decay((now - created).total_seconds())
+    return gains
+
+
+def _apply(gains, now):
+    scores = TrendingScore.objects.in_bulk(list(gains))
+    for pk, score in scores.items():
+        score.score += gains.pop(pk)
+        score.computed = now
+    TrendingScore.objects.bulk_update(
+        scores.values(), ['score', 'computed'], batch_size=BATCH_SIZE
+    )
+    TrendingScore.objects.bulk_create(
+        [TrendingScore(post_id=pk, score=gain, computed=now)
+         for pk, gain in gains.items()],
+        batch_size=BATCH_SIZE
+    )
+
+
+def update(now=None, seed=None):
+    """Сворачивает новые события в рейтинг к моменту now.
+    seed - дополнительные события (post_id, weight, created).
+    Возвращает (число событий, число постов в рейтинге).
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        previous = TrendingScore.objects.aggregate(
+            computed=Max('computed')
+        )['computed']
+        if previous is not None:
+            TrendingScore.objects.update(
+                score=F('score') * decay((now - previous).total_seconds()),
+                computed=now
+            )
+        last = Engagement.objects.aggregate(last=Max('pk'))['last'] or 0
+        events = Engagement.objects.filter(pk__lte=last)
+        gains = _gains(
+            events.values_list('post_id', 'weight', 'created').iterator(),
+            now
+        )
+        for post_id, gain in _gains(seed or (), now).items():
+            gains[post_id] += gain
+        _apply(gains, now)
+        total, _ = events.delete()
+        TrendingScore.objects.filter(
+            score__lt=settings.TRENDING_MIN_SCORE
+        ).delete()
+    bump_generation(TRENDING_GENERATION)
+    return total, TrendingScore.objects.count()
+
+
+def rebuild(now=None):
+    """Строит рейтинг заново по комментариям за последние
+    TRENDING_WINDOW_HOURS часов и ещё не учтённым событиям подписок.
+    Ещё не учтённые события комментариев отбрасываются: эти
+    комментарии уже есть в выборке. Подписки без времени создания
+    в пересчёт не попадают.
+    """
+    now = now or timezone.now()
+    since = now - timedelta(hours=settings.TRENDING_WINDOW_HOURS)
+    weight = settings.TRENDING_WEIGHTS['comment']
+    comments = Comment.objects.filter(created__gte=since).values_list(
+        'post_id', 'created'
+    ).iterator()
+    with transaction.atomic():
+        TrendingScore.objects.all().delete()
+        Engagement.objects.filter(kind='comment').delete()
+        return update(now, (
+            (post_id, weight, created) for post_id, created in comments
+        ))
+
+
+def trending_posts():
+    """Посты рейтинга по убыванию score, не больше TRENDING_LIMIT."""
+    return Post.objects.filter(trending__isnull=False).select_related(
+        'author', 'group'
+    ).order_by('-trending__score', '-pk')[:settings.TRENDING_LIMIT]
@@ -7,9 +7,24 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('trending/', views.trending, name='trending'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/', views.comments, name='comments'
+    ),
+    path(
+        'posts/<int:post_id>/comments/<int:comment_id>/',
+        views.comments,
+        name='comment_replies'
+    ),
+    path('search/', views.search, name='search'),
+    path(
+        'export/<str:resource>/',
+        views.export_content,
+        name='export_content'
+    ),
     path(
         'delete/<int:post_id>',
         views.delete_post,
@@ -1,9 +1,186 @@
 """Паджинатор для views.py"""
+import base64
+import binascii
+from collections.abc import Sequence
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
 from django.core.paginator import Paginator
 from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+# Поколения кеша лент постов и профилей, см. core.cache.
+FEED_GENERATION = 'posts:feed'
+PROFILE_GENERATION = 'posts:profile:{}'
+# Счётчики комментариев выводит только API, поэтому комментарии
+# сбрасывают его ленты, а HTML-ленты не трогают.
+COMMENT_GENERATION = 'posts:comments'
+
+CURSOR_NEXT = 'n'
+CURSOR_PREVIOUS = 'p'
+# Поля ключа курсора: дата и уникальный id для разрешения равенства дат.
+CURSOR_KEYS = ('pub_date', 'pk')
+COMMENT_KEYS = ('created', 'pk')
+
+
+def profile_generation(request, username):
+    """Поколение кеша страницы профиля: меняется при подписках."""
+    return PROFILE_GENERATION.format(username)
+
+
+def post_card_key(post):
+    """Ключ карточки поста из includes/author_post_list.html: версия
+    поста и имя автора, единственное поле автора в карточке.
+    """
+    return make_template_fragment_key('post_card', [
+        post.pk, post.updated.isoformat(), post.author.get_full_name()
+    ])
+
+
+def forget_post_card(post):
+    """Удаляет закешированную карточку поста для текущей версии поста."""
+    cache.delete(post_card_key(post))
+
+
+class InvalidCursor(Exception):
+    """Курсор не удалось разобрать."""
+
+
+def encode_cursor(post, direction, keys=CURSOR_KEYS):
+    """Упаковывает позицию (pub_date, id) поста в непрозрачный токен."""
+    date_key, id_key = keys
+    pub_date, pk = getattr(post, date_key), getattr(post, id_key)
+    raw = f'{direction}|{pub_date.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает токен в (direction, pub_date, id).
+    При любой ошибке разбора поднимает InvalidCursor.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(token)
+    if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS) or pub_date is None:
+        raise InvalidCursor(token)
+    return direction, pub_date, pk
+
+
+class CursorPage(Sequence):
+    """Страница курсорной паджинации.
+    В отличие от Page не знает ни номера, ни общего числа страниц,
+    поэтому шаблон paginator.html показывает только
+    ссылки «Предыдущая» и «Следующая».
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-паджинатор по паре (pub_date, id).
+    Вместо COUNT(*) и OFFSET выбирает per_page + 1 строк по индексу
+    начиная с позиции из курсора, поэтому глубокие страницы
+    обходятся так же дёшево, как первая.
+    keys - имена полей или аннотаций queryset для этой пары.
+    """
+
+    def __init__(self, object_list, per_page, keys=CURSOR_KEYS):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.keys = keys
+
+    def _seek(self, pub_date, pk, lookup, descending):
+        date_key, id_key = self.keys
+        sign = '-' if descending else ''
+        return self.object_list.filter(
+            Q(**{f'{date_key}__{lookup}': pub_date})
+            | Q(**{date_key: pub_date, f'{id_key}__{lookup}': pk})
+        ).order_by(f'{sign}{date_key}', f'{sign}{id_key}')
+
+    def _after(self, pub_date, pk):
+        return self._seek(pub_date, pk, 'lt', descending=True)
+
+    def _before(self, pub_date, pk):
+        return self._seek(pub_date, pk, 'gt', descending=False)
+
+    def page(self, cursor=None):
+        """Возвращает CursorPage для токена cursor.
+        Пустой курсор означает первую (самую свежую) страницу.
+        """
+        direction = CURSOR_NEXT
+        date_key, id_key = self.keys
+        queryset = self.object_list.order_by(f'-{date_key}', f'-{id_key}')
+        if cursor:
+            direction, pub_date, pk = decode_cursor(cursor)
+            if direction == CURSOR_NEXT:
+                queryset = self._after(pub_date, pk)
+            else:
+                queryset = self._before(pub_date, pk)
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == CURSOR_PREVIOUS:
+            # Назад листали со страницы, у которой точно есть следующая.
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+        if not rows:
+            has_next = has_previous = False
+        return CursorPage(
+            rows,
+            self,
+            encode_cursor(rows[-1], CURSOR_NEXT, self.keys)
+            if has_next else None,
+            encode_cursor(rows[0], CURSOR_PREVIOUS, self.keys)
+            if has_previous else None,
+        )
+
+    def get_page(self, cursor=None):
+        """Как Paginator.get_page: битый курсор даёт первую страницу."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
 
 
-def paginator_obg(request, post):
+def paginator_obg(request, post, keys=CURSOR_KEYS):
+    """Паджинирует queryset постов.
+    Курсорный режим включается настройкой PAGINATION_MODE = 'cursor'
+    или параметром ?cursor= в запросе.
+    """
+    if settings.PAGINATION_MODE == 'cursor' or 'cursor' in request.GET:
+        paginator = CursorPaginator(post, settings.PAGE_COUNTER_TEN, keys)
+        return paginator.get_page(request.GET.get('cursor'))
     paginator = Paginator(post, settings.PAGE_COUNTER_TEN)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
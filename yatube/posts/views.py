@@ -1,15 +1,33 @@
 """Модуль обработки адресов posts/views.py"""
 from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 
 from .models import Post, Follow, Group, User, Comment
 from .forms import PostForm, CommentForm
-from .utils import paginator_obg
-from django.views.decorators.cache import cache_page
+from .utils import (
+    paginator_obg, forget_post_card, profile_generation, FEED_GENERATION
+)
+from .timeline import follow_feed, FEED_KEYS
+from .counters import profile_for
+from .etags import group_posts_etag, post_detail_etag, profile_etag
+from .search import search_posts
+from . import export, threads
+from .graph import get_graph
+from .trending import TRENDING_GENERATION, trending_posts
 from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from django.utils.http import urlencode
+from django.views.decorators.http import condition
+from core.cache import cache_versioned
+from core.replicas import read_from_replica
 
 
-@cache_page(settings.CACHE_INDEX_TIME)
+@read_from_replica
+@cache_versioned(settings.CACHE_INDEX_TIME, FEED_GENERATION)
 def index(request):
     """Функция index определяет свойства главной страницы.
     template - путь файла html главной страницы,
@@ -18,7 +36,7 @@ def index(request):
     """
     template_name = 'posts/index.html'
     title = "Это главная страница проекта Yatube"
-    post_list = Post.objects.all()
+    post_list = Post.objects.select_related('author', 'group')
     page_obj = paginator_obg(request, post_list)
     context = {
         'title': title,
@@ -27,6 +45,26 @@ def index(request):
     return render(request, template_name, context)
 
 
+@read_from_replica
+@cache_versioned(
+    settings.CACHE_INDEX_TIME, FEED_GENERATION, TRENDING_GENERATION
+)
+def trending(request):
+    """Вкладка популярного: посты по рейтингу TrendingScore,
+    который пересчитывает команда update_trending, а не запрос.
+    """
+    paginator = Paginator(trending_posts(), settings.PAGE_COUNTER_TEN)
+    context = {
+        'title': 'Популярное',
+        'page_obj': paginator.get_page(request.GET.get('page')),
+        'trending': True,
+    }
+    return render(request, 'posts/index.html', context)
+
+
+@read_from_replica
+@condition(etag_func=group_posts_etag)
+@cache_versioned(settings.CACHE_INDEX_TIME, FEED_GENERATION)
 def group_posts(request, slug):
     """Функция group_posts определяет свойства страницы cообществ.
     template - путь файла html страницы сообществ,
@@ -36,7 +74,7 @@ def group_posts(request, slug):
     """
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    posts = group.groups.all()
+    posts = group.groups.select_related('author', 'group')
     page_obj = paginator_obg(request, posts)
     context = {
         'title': 'Группы',
@@ -46,27 +84,37 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+@read_from_replica
+@condition(etag_func=profile_etag)
+@cache_versioned(
+    settings.CACHE_INDEX_TIME, FEED_GENERATION, profile_generation
+)
 def profile(request, username):
     """Вью-функция страницы поста.
     user - получение пользователя из User.
     posts - фильтр постов по user.
     """
-    user = get_object_or_404(User, username=username)
-    posts = user.posts.all()
+    user = get_object_or_404(
+        User.objects.select_related('profile'), username=username
+    )
+    posts = user.posts.select_related('author', 'group')
     page_obj = paginator_obg(request, posts)
+    profile = profile_for(user)
+    following = False
     if request.user.is_authenticated:
-        following = request.user.follower.filter(author=user).exists()
-    else:
-        following = False
+        following = get_graph().is_following(request.user.pk, user.pk)
     context = {
         'author': user,
-        'count': posts.count(),
+        'count': profile.post_count,
+        'profile': profile,
         'page_obj': page_obj,
         'following': following
     }
     return render(request, 'posts/profile.html', context)
 
 
+@read_from_replica
+@condition(etag_func=post_detail_etag)
 def post_detail(request, post_id):
     """Вью-функция страницы поста.
     posts - получение поста по id.
@@ -75,20 +123,66 @@ def post_detail(request, post_id):
     count - подсчет постов автора.
     """
     form = CommentForm()
-    posts = Post.objects.get(id=post_id)
+    posts = get_object_or_404(
+        Post.objects.select_related('author__profile', 'group'), id=post_id
+    )
     author = posts.author
     title = f'{posts.text[:30]}'
-    count = Post.objects.filter(author=posts.author).count()
+    count = profile_for(author).post_count
     context = {
         'title': title,
         'posts': posts,
         'author': author,
         'count': count,
         'form': form,
+        'comments': threads.page(
+            posts.comments, request.GET.get('cursor')
+        ),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@read_from_replica
+@condition(etag_func=post_detail_etag)
+def comments(request, post_id, comment_id=None):
+    """Фрагмент со следующей страницей комментариев для кнопок
+    «Показать ещё» и «Показать ответы» на странице поста.
+    comment_id ограничивает страницу ответами на этот комментарий.
+    """
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
+    root = None
+    if comment_id is not None:
+        root = get_object_or_404(post.comments, id=comment_id)
+    context = {
+        'post': post,
+        'root': root,
+        'comments': threads.page(
+            post.comments, request.GET.get('cursor'), root
+        ),
+    }
+    return render(request, 'posts/includes/comment_page.html', context)
+
+
+def search(request):
+    """Вью-функция поиска по постам и комментариям.
+    query - строка поиска из параметра q,
+    page_obj - страница результатов в порядке релевантности,
+    page_query - параметры, которые сохраняет паджинатор.
+    """
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        paginator = Paginator(search_posts(query), settings.PAGE_COUNTER_TEN)
+        page_obj = paginator.get_page(request.GET.get('page'))
+    context = {
+        'title': 'Поиск',
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
     """Вью-функция создания поста.
@@ -130,6 +224,7 @@ def post_edit(request, post_id):
     if author.id != post.author.id:
         return redirect('posts:post_detail', post.id)
     elif author.id == post.author.id and form.is_valid():
+        forget_post_card(post)
         form.save()
         return redirect('posts:post_edit', post.id)
     context = {
@@ -145,6 +240,7 @@ def post_edit(request, post_id):
 def delete_post(request, post_id):
     post = Post.objects.get(id=post_id)
     if request.user == post.author:
+        forget_post_card(post)
         post.delete()
     return redirect('posts:index')
 
@@ -157,7 +253,11 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        comment.parent = threads.reply_target(
+            post, request.POST.get('parent')
+        )
+        with transaction.atomic():
+            comment.save()
     return redirect('posts:post_detail', post_id=post_id)
 
 
@@ -171,16 +271,25 @@ def delete_comment(request, comment_id, post_id):
 
 
 @login_required
+@read_from_replica
 def follow_index(request):
     """Функция отображения постов, на которые
     подписан пользователь."""
     template_name = 'posts/follow.html'
     title = "Страница постов с подписками"
-    posts = Post.objects.filter(author__following__user=request.user)
-    page_obj = paginator_obg(request, posts)
+    posts = follow_feed(request.user).select_related('author', 'group')
+    page_obj = paginator_obg(request, posts, FEED_KEYS)
+    recommended = get_graph().recommendations(
+        request.user.pk, settings.FOLLOW_RECOMMENDATIONS
+    )
+    if recommended:
+        # Один запрос за пользователями, в порядке рекомендаций.
+        users = User.objects.in_bulk(recommended)
+        recommended = [users[pk] for pk in recommended if pk in users]
     context = {
         'title': title,
         'page_obj': page_obj,
+        'recommended': recommended,
     }
     return render(request, template_name, context)
 
@@ -189,11 +298,10 @@ def follow_index(request):
 def profile_follow(request, username):
     """Функция подписки на автора."""
     author = get_object_or_404(User, username=username)
-    check_follow = Follow.objects.filter(
-        author=author, user=request.user
-    ).exists()
-    if not check_follow and request.user != author:
-        request.user.follower.create(author=author)
+    if request.user != author:
+        # Проверка и запись одним get_or_create: граф подписок может
+        # отставать от базы, поэтому для записи он не годится.
+        Follow.objects.get_or_create(user=request.user, author=author)
     return redirect('posts:follow_index')
 
 
@@ -203,3 +311,41 @@ def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     author.following.filter(user=request.user).delete()
     return redirect('posts:index')
+
+
+@staff_member_required
+def export_content(request, resource):
+    """Потоковая выгрузка ресурса для персонала.
+    format - ndjson или csv,
+    since - только изменённые после даты ISO 8601,
+    after_id - только с id больше заданного,
+    gzip - сжимать ответ на лету.
+    """
+    fmt = request.GET.get('format', export.NDJSON)
+    since = request.GET.get('since')
+    if since:
+        since = parse_datetime(since)
+        if since is None:
+            return HttpResponseBadRequest('Неверная дата since')
+    after_id = request.GET.get('after_id')
+    if after_id is not None and not after_id.isdigit():
+        return HttpResponseBadRequest('after_id должен быть числом')
+    try:
+        lines = export.export(
+            [resource], fmt, since or None,
+            int(after_id) if after_id else None
+        )
+    except export.ExportError as error:
+        return HttpResponseBadRequest(str(error))
+    compress = bool(request.GET.get('gzip'))
+    filename = f'{resource}.{fmt}'
+    if compress:
+        filename += '.gz'
+        content_type = 'application/gzip'
+    else:
+        content_type = f'{export.CONTENT_TYPES[fmt]}; charset=utf-8'
+    response = StreamingHttpResponse(
+        export.encode(lines, compress), content_type=content_type
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
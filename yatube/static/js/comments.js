@@ -0,0 +1,24 @@
+// «Показать ещё» и «Показать ответы» под комментариями: вместо
+// перехода подгружают следующую порцию ветки фрагментом и вставляют
+// её на место кнопки. Комментарии идут в порядке обхода дерева,
+// поэтому фрагмент всегда продолжает список ровно с этого места.
+document.addEventListener('click', function (event) {
+  var link = event.target.closest('[data-fragment]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.dataset.fragment, {credentials: 'same-origin'})
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.status);
+      }
+      return response.text();
+    })
+    .then(function (html) {
+      link.outerHTML = html;
+    })
+    .catch(function () {
+      window.location = link.href;
+    });
+});
@@ -48,11 +48,15 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
     'sorl.thumbnail',
     'debug_toolbar',
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
+    'core.querylog.QueryLogMiddleware',
+    'core.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,10 +74,22 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
+# С каких адресов Prometheus может читать /metrics.
+METRICS_ALLOWED_IPS = INTERNAL_IPS
+
+# Журнал медленных и повторяющихся запросов (core.querylog),
+# включается переменной окружения YATUBE_QUERY_LOG=1.
+QUERY_LOG_ENABLED = os.environ.get('YATUBE_QUERY_LOG') == '1'
+# Доля запросов, в которых замеряется SQL.
+QUERY_LOG_SAMPLE_RATE = 0.1
+QUERY_LOG_SLOW_MS = 100
+# Больше стольких одинаковых запросов за запрос - подозрение на N+1.
+QUERY_LOG_REPEAT_THRESHOLD = 10
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates с замером времени рендеринга для /metrics.
+        'BACKEND': 'core.metrics.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -97,9 +113,41 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение живёт между запросами, а не открывается заново.
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# PRAGMA для каждого нового соединения SQLite (core.sqlite).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # Отображать в память до 256 МБ файла базы.
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение - размер кеша страниц в КБ (64 МБ).
+    'cache_size': -64 * 1024,
+    # Сколько мс ждать снятия блокировки записи.
+    'busy_timeout': 5000,
+}
+
+# Реплики только для чтения, через запятую:
+# YATUBE_REPLICAS=/data/replica1.sqlite3,/data/replica2.sqlite3
+# Маршрутизация - core.replicas; в тестах реплики зеркалят default.
+REPLICA_DATABASES = []
+for number, name in enumerate(
+    filter(None, os.environ.get('YATUBE_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica_{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(f'replica_{number}')
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+# Сколько секунд после записи клиент читает только из основной базы.
+REPLICA_PIN_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -149,13 +197,63 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 PAGE_COUNTER_TEN = 10
+# Комментариев на странице поста и в каждой подгрузке «Показать ещё».
+COMMENTS_PER_PAGE = 20
+# Уровней вложенности ответов всего и сразу видимых на странице поста;
+# более глубокие открываются ссылкой «Показать ответы».
+COMMENT_MAX_DEPTH = 5
+COMMENT_PAGE_DEPTH = 3
+# Граф подписок в памяти процесса (posts.graph): наибольший возраст
+# в секундах, сколько подписок каждого друга учитывать в рекомендациях
+# и сколько рекомендаций показывать в ленте подписок.
+FOLLOW_GRAPH_MAX_AGE = 300
+FOLLOW_GRAPH_FANOUT = 200
+FOLLOW_RECOMMENDATIONS = 5
+# Рейтинг популярного (posts.trending): период полураспада вклада
+# события, веса событий, порог удаления из рейтинга, длина рейтинга
+# и окно комментариев для update_trending --rebuild.
+TRENDING_HALF_LIFE_HOURS = 12
+TRENDING_WEIGHTS = {'comment': 1.0, 'follow': 3.0}
+TRENDING_MIN_SCORE = 0.01
+TRENDING_LIMIT = 100
+TRENDING_WINDOW_HOURS = 72
+# Наибольший ?limit= в JSON API.
+API_MAX_LIMIT = 100
+# 'page' - номера страниц через Paginator, 'cursor' - keyset по ?cursor=
+PAGINATION_MODE = 'page'
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Варианты картинок постов для тега {% responsive_image %}
+# (core.images); их же заранее строит process_thumbnails.
+RESPONSIVE_IMAGE_WIDTHS = (320, 640, 960)
+RESPONSIVE_IMAGE_RATIO = 339 / 960
+RESPONSIVE_IMAGE_FORMATS = (
+    ('WEBP', 'image/webp'),
+)
+RESPONSIVE_IMAGE_OPTIONS = {'crop': 'center', 'upscale': True}
+RESPONSIVE_IMAGE_SIZES = '(max-width: 960px) 100vw, 960px'
+THUMBNAIL_JOB_LEASE = 5 * 60
+THUMBNAIL_JOB_MAX_ATTEMPTS = 3
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
-CACHE_INDEX_TIME = 20
+# Кеш ленты версионирован (core.cache), TTL ограничивает только память.
+CACHE_INDEX_TIME = 60 * 60
+# Защита от cache stampede (core.cache.get_or_compute): сколько секунд
+# отдавать устаревшую страницу, пока один запрос её пересчитывает,
+# время жизни блокировки пересчёта и агрессивность раннего обновления.
+CACHE_STALE_GRACE = 30
+CACHE_LOCK_TIMEOUT = 10
+CACHE_EARLY_REFRESH_BETA = 1.0
+# Авторы с большим числом подписчиков не рассылают посты в ленты,
+# их посты подмешиваются в follow_index при чтении.
+TIMELINE_FANOUT_LIMIT = 10000
+# Строк Timeline в одном INSERT. Django 2.2 не урезает batch_size
+# под SQLite: в запросе не больше 999 параметров (по 3 на строку)
+# и 500 термов UNION ALL.
+TIMELINE_BATCH_SIZE = 300